@@ -33,6 +33,14 @@ from core.config import settings  # Adjust the import path as necessary
 config.set_main_option("sqlalchemy.url", settings.db.url)
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # the FTS5 index and its shadow tables are created by migration 5e8b2f61c0d4
+    # and have no model, autogenerate must not drop them
+    if type_ == "table" and name.startswith("products_fts"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -49,6 +57,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +67,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,68 @@
+"""add product versions and table_versions change counter
+
+Revision ID: a3c41e9d7b20
+Revises: 9f73ae58ff03
+Create Date: 2026-10-17 09:00:12.418203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c41e9d7b20"
+down_revision: Union[str, None] = "9f73ae58ff03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE_VERSION_TRIGGERS = {
+    f"products_table_version_{event.lower()}": event
+    for event in ("INSERT", "UPDATE", "DELETE")
+}
+
+
+def upgrade() -> None:
+    op.add_column(
+        "products",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("table_name"),
+    )
+    op.execute(
+        "INSERT INTO table_versions (table_name, version) VALUES ('products', 0)"
+    )
+
+    # the row version only follows data columns, so the trigger never re-fires itself
+    op.execute("""
+        CREATE TRIGGER products_version_bump
+        AFTER UPDATE OF name, description, price ON products
+        BEGIN
+            UPDATE products SET version = OLD.version + 1 WHERE id = NEW.id;
+        END
+        """)
+    for trigger_name, event in TABLE_VERSION_TRIGGERS.items():
+        op.execute(f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {event} ON products
+            BEGIN
+                UPDATE table_versions SET version = version + 1
+                WHERE table_name = 'products';
+            END
+            """)
+
+
+def downgrade() -> None:
+    for trigger_name in TABLE_VERSION_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+    op.execute("DROP TRIGGER IF EXISTS products_version_bump")
+    op.drop_table("table_versions")
+    op.drop_column("products", "version")
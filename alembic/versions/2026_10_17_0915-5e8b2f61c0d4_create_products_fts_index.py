@@ -0,0 +1,65 @@
+"""create products_fts full-text index
+
+Revision ID: 5e8b2f61c0d4
+Revises: a3c41e9d7b20
+Create Date: 2026-10-17 09:15:47.903126
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8b2f61c0d4"
+down_revision: Union[str, None] = "a3c41e9d7b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # external content table: the index stores tokens only and reads the
+    # columns back from products; prefix indexes keep "term*" queries cheap
+    op.execute("""
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            name,
+            description,
+            content='products',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """)
+    op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+    op.execute("""
+        CREATE TRIGGER products_fts_insert AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts (rowid, name, description)
+            VALUES (NEW.id, NEW.name, NEW.description);
+        END
+        """)
+    op.execute("""
+        CREATE TRIGGER products_fts_delete AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description)
+            VALUES ('delete', OLD.id, OLD.name, OLD.description);
+        END
+        """)
+    # only text columns are indexed, other updates must not reindex the row
+    op.execute("""
+        CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description)
+            VALUES ('delete', OLD.id, OLD.name, OLD.description);
+            INSERT INTO products_fts (rowid, name, description)
+            VALUES (NEW.id, NEW.name, NEW.description);
+        END
+        """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS products_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_insert")
+    op.execute("DROP TABLE IF EXISTS products_fts")
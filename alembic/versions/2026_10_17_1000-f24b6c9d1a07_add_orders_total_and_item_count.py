@@ -0,0 +1,86 @@
+"""add orders total and item_count maintained by line item triggers
+
+Revision ID: f24b6c9d1a07
+Revises: 8d1f4a7c2e93
+Create Date: 2026-10-17 10:00:41.092716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f24b6c9d1a07"
+down_revision: Union[str, None] = "8d1f4a7c2e93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ADD_LINE = """
+    UPDATE orders
+    SET total = total + NEW.quantity * NEW.unit_price,
+        item_count = item_count + NEW.quantity
+    WHERE id = NEW.order_id;
+"""
+REMOVE_LINE = """
+    UPDATE orders
+    SET total = total - OLD.quantity * OLD.unit_price,
+        item_count = item_count - OLD.quantity
+    WHERE id = OLD.order_id;
+"""
+ORDER_TOTALS_TRIGGERS = {
+    "order_lines_totals_insert": ("INSERT", ADD_LINE),
+    "order_lines_totals_delete": ("DELETE", REMOVE_LINE),
+    # moving a line to another order is a remove plus an add
+    "order_lines_totals_update": (
+        "UPDATE OF order_id, quantity, unit_price",
+        REMOVE_LINE + ADD_LINE,
+    ),
+}
+
+
+def upgrade() -> None:
+    op.add_column(
+        "orders",
+        sa.Column("total", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "orders",
+        sa.Column("item_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_index(
+        "ix_orders_promo_code_total",
+        "orders",
+        ["promo_code", "total", "item_count"],
+        unique=False,
+    )
+    op.execute("""
+        UPDATE orders
+        SET total = lines.total, item_count = lines.item_count
+        FROM (
+            SELECT order_id,
+                   SUM(quantity * unit_price) AS total,
+                   SUM(quantity) AS item_count
+            FROM order_product_association_table
+            GROUP BY order_id
+        ) AS lines
+        WHERE orders.id = lines.order_id
+        """)
+    for trigger_name, (event, body) in ORDER_TOTALS_TRIGGERS.items():
+        op.execute(f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {event} ON order_product_association_table
+            BEGIN
+                {body}
+            END
+            """)
+
+
+def downgrade() -> None:
+    for trigger_name in ORDER_TOTALS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+    op.drop_index("ix_orders_promo_code_total", table_name="orders")
+    op.drop_column("orders", "item_count")
+    op.drop_column("orders", "total")
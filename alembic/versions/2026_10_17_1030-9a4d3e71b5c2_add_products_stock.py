@@ -0,0 +1,62 @@
+"""add products stock
+
+Revision ID: 9a4d3e71b5c2
+Revises: 2b7e9c4f8a16
+Create Date: 2026-10-17 10:30:09.318542
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4d3e71b5c2"
+down_revision: Union[str, None] = "2b7e9c4f8a16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_version_bump(columns: str) -> None:
+    # the row version only follows data columns, so the trigger never re-fires itself
+    op.execute("DROP TRIGGER IF EXISTS products_version_bump")
+    op.execute(f"""
+        CREATE TRIGGER products_version_bump
+        AFTER UPDATE OF {columns} ON products
+        BEGIN
+            UPDATE products SET version = OLD.version + 1 WHERE id = NEW.id;
+        END
+        """)
+
+
+def initial_stock() -> int | None:
+    value = context.get_x_argument(as_dictionary=True).get("initial_stock")
+    return None if value is None else int(value)
+
+
+def upgrade() -> None:
+    # every existing product would start out of stock and every checkout would
+    # fail, so their starting stock has to be chosen explicitly:
+    #   alembic -x initial_stock=<units> upgrade head
+    stock = initial_stock()
+    if stock is None and op.get_bind().scalar(sa.text("SELECT count(*) FROM products")):
+        raise RuntimeError(
+            "products exist: pass their starting stock with "
+            "`alembic -x initial_stock=<units> upgrade head`"
+        )
+    op.add_column(
+        "products",
+        sa.Column("stock", sa.Integer(), server_default="0", nullable=False),
+    )
+    if stock:
+        op.execute(
+            sa.text("UPDATE products SET stock = :stock").bindparams(stock=stock)
+        )
+    # stock is part of the product body, so reserving it changes the ETag
+    create_version_bump("name, description, price, stock")
+
+
+def downgrade() -> None:
+    create_version_bump("name, description, price")
+    op.drop_column("products", "stock")
@@ -0,0 +1,81 @@
+"""store orders.created_at in one text format
+
+Revision ID: 0c5e7a9b3d28
+Revises: d6c0b83f5e19
+Create Date: 2026-10-17 11:00:17.540283
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0c5e7a9b3d28"
+down_revision: Union[str, None] = "d6c0b83f5e19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the format SQLAlchemy writes datetimes in on SQLite, local time like datetime.now
+CREATED_AT_DEFAULT = "(strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))"
+
+# as created in f24b6c9d1a07; they reference orders, so SQLite refuses to
+# rename the rebuilt table into place while they exist
+ADD_LINE = """
+    UPDATE orders
+    SET total = total + NEW.quantity * NEW.unit_price,
+        item_count = item_count + NEW.quantity
+    WHERE id = NEW.order_id;
+"""
+REMOVE_LINE = """
+    UPDATE orders
+    SET total = total - OLD.quantity * OLD.unit_price,
+        item_count = item_count - OLD.quantity
+    WHERE id = OLD.order_id;
+"""
+ORDER_TOTALS_TRIGGERS = {
+    "order_lines_totals_insert": ("INSERT", ADD_LINE),
+    "order_lines_totals_delete": ("DELETE", REMOVE_LINE),
+    "order_lines_totals_update": (
+        "UPDATE OF order_id, quantity, unit_price",
+        REMOVE_LINE + ADD_LINE,
+    ),
+}
+
+
+def rebuild_orders(created_at_default: str) -> None:
+    # SQLite cannot change a column default in place, batch mode rebuilds the table
+    for trigger_name in ORDER_TOTALS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.alter_column(
+            "created_at",
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            server_default=sa.text(created_at_default),
+        )
+    for trigger_name, (event, body) in ORDER_TOTALS_TRIGGERS.items():
+        op.execute(f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {event} ON order_product_association_table
+            BEGIN
+                {body}
+            END
+            """)
+
+
+def upgrade() -> None:
+    rebuild_orders(CREATED_AT_DEFAULT)
+    # rows written by the old CURRENT_TIMESTAMP default have no fraction, which
+    # sorted them before their own keyset cursor, and are in UTC while every
+    # other row is local time
+    op.execute("""
+        UPDATE orders
+        SET created_at = strftime('%Y-%m-%d %H:%M:%f000', created_at, 'localtime')
+        WHERE length(created_at) = 19
+        """)
+
+
+def downgrade() -> None:
+    rebuild_orders("(CURRENT_TIMESTAMP)")
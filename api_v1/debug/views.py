@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+
+from core.instrumentation import query_instrumentation
+from core.models import db_helper
+from core.outbox import outbox_dispatcher
+from core.retry import retry_on_locked
+from core.write_coordinator import write_coordinator
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+@router.get("/queries/")
+async def get_recent_queries():
+    """
+    Statement count, database time and repeated statement shapes of the
+    most recent requests, newest first.
+    """
+    return {
+        "n_plus_one_threshold": query_instrumentation.n_plus_one_threshold,
+        "requests": list(reversed(query_instrumentation.history)),
+    }
+
+
+@router.get("/db/")
+async def get_db_metrics():
+    """
+    Connection pool usage, checkout wait times, open request sessions,
+    retries of units of work that hit a locked database, write grouping and
+    outbox delivery lag.
+    """
+    return {
+        **db_helper.metrics(),
+        "lock_retries": retry_on_locked.stats(),
+        "write_coordinator": write_coordinator.stats(),
+        "outbox": {
+            **outbox_dispatcher.stats(),
+            **await outbox_dispatcher.backlog(),
+        },
+    }
@@ -0,0 +1,394 @@
+"""
+Create
+Read
+Update
+Delete
+"""
+
+from itertools import groupby
+from typing import AsyncIterator
+
+from sqlalchemy import (
+    Select,
+    case,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from api_v1.products.cache import product_cache
+from api_v1.products.crud import OutOfStockError, reserve_stock
+from core.models import Order, OrderProductAssociation, OutboxEvent, Product
+from core.retry import retry_on_locked
+
+from . import schemas
+from .schemas import OrderCreate, OrderFilters, OrderLines, OrdersPromotion
+
+ORDER_CREATED = "order.created"
+
+
+class MissingProductsError(LookupError):
+    def __init__(self, product_ids: set[int]):
+        self.product_ids = product_ids
+        super().__init__(
+            f"Products not found: {', '.join(map(str, sorted(product_ids)))}!"
+        )
+
+
+def _filter_orders(stmt: Select, filters: OrderFilters | None) -> Select:
+    if filters is not None:
+        if filters.created_from is not None:
+            stmt = stmt.where(Order.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            stmt = stmt.where(Order.created_at < filters.created_to)
+    return stmt
+
+
+def _page_orders(
+    filters: OrderFilters | None,
+    limit: int,
+    after: tuple | None,
+) -> Select:
+    # newest first, read backwards off the (created_at, id) index
+    stmt = _filter_orders(select(Order), filters)
+    if after is not None:
+        stmt = stmt.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+    return stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
+
+def _order_lines(details) -> list[schemas.OrderLine]:
+    return [schemas.OrderLine.model_validate(detail) for detail in details]
+
+
+async def _get_orders_joined(
+    session: AsyncSession,
+    page: Select,
+) -> list[schemas.Order]:
+    page = page.subquery("page")
+    stmt = (
+        select(
+            page.c.id,
+            page.c.promo_code,
+            page.c.created_at,
+            page.c.total,
+            page.c.item_count,
+            OrderProductAssociation.product_id,
+            OrderProductAssociation.quantity,
+            OrderProductAssociation.unit_price,
+        )
+        .outerjoin(
+            OrderProductAssociation, OrderProductAssociation.order_id == page.c.id
+        )
+        .order_by(
+            page.c.created_at.desc(),
+            page.c.id.desc(),
+            OrderProductAssociation.id,
+        )
+    )
+    orders = []
+    result = await session.execute(stmt)
+    for _, rows in groupby(result, key=lambda row: row.id):
+        rows = list(rows)
+        orders.append(
+            schemas.Order(
+                id=rows[0].id,
+                promo_code=rows[0].promo_code,
+                created_at=rows[0].created_at,
+                total=rows[0].total,
+                item_count=rows[0].item_count,
+                # an order without lines comes back as one row of NULLs
+                items=_order_lines(row for row in rows if row.product_id is not None),
+            )
+        )
+    return orders
+
+
+async def get_orders(
+    session: AsyncSession,
+    limit: int,
+    after: tuple | None = None,
+    filters: OrderFilters | None = None,
+    lines: OrderLines = OrderLines.none,
+) -> tuple[list[schemas.Order], tuple | None]:
+    """
+    Return one page of orders, newest first, and the position to continue after.
+
+    Only `limit + 1` orders are read whatever the size of the order history.
+    Line items are loaded for this page only: with one `selectinload` query,
+    or in the same statement as a flat outer join.
+    """
+    page = _page_orders(filters, limit, after)
+    if lines is OrderLines.join:
+        orders = await _get_orders_joined(session=session, page=page)
+    else:
+        if lines is OrderLines.selectin:
+            page = page.options(selectinload(Order.product_details))
+        orders = [
+            schemas.Order(
+                id=order.id,
+                promo_code=order.promo_code,
+                created_at=order.created_at,
+                total=order.total,
+                item_count=order.item_count,
+                items=(
+                    _order_lines(order.product_details)
+                    if lines is OrderLines.selectin
+                    else None
+                ),
+            )
+            for order in await session.scalars(page)
+        ]
+    if len(orders) > limit:
+        del orders[limit:]
+        return orders, (orders[-1].created_at, orders[-1].id)
+    return orders, None
+
+
+async def stream_orders(
+    session: AsyncSession,
+    chunk_size: int,
+    filters: OrderFilters | None = None,
+) -> AsyncIterator[schemas.Order]:
+    """
+    Yield every order with its line items, oldest first, from a server-side cursor.
+
+    Orders and lines come from one flat outer join streamed with `yield_per`,
+    so at most `chunk_size` rows and a single order are held at a time,
+    whatever the size of the order history.
+    """
+    stmt = (
+        _filter_orders(
+            select(
+                Order.id,
+                Order.promo_code,
+                Order.created_at,
+                Order.total,
+                Order.item_count,
+                OrderProductAssociation.product_id,
+                OrderProductAssociation.quantity,
+                OrderProductAssociation.unit_price,
+            ).outerjoin(
+                OrderProductAssociation,
+                OrderProductAssociation.order_id == Order.id,
+            ),
+            filters,
+        )
+        .order_by(Order.created_at, Order.id, OrderProductAssociation.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)
+    order: schemas.Order | None = None
+    async for row in result:
+        if order is None or order.id != row.id:
+            if order is not None:
+                yield order
+            order = schemas.Order(
+                id=row.id,
+                promo_code=row.promo_code,
+                created_at=row.created_at,
+                total=row.total,
+                item_count=row.item_count,
+                items=[],
+            )
+        if row.product_id is not None:
+            order.items.append(schemas.OrderLine.model_validate(row))
+    if order is not None:
+        yield order
+
+
+async def add_order(session: AsyncSession, order_in: OrderCreate) -> schemas.Order:
+    """
+    Unit of work for the write coordinator: insert an order with its lines
+    without committing.
+
+    The order is one INSERT ... RETURNING. All lines are one INSERT ... SELECT
+    over `products`, so each `unit_price` is snapshotted from the catalog in
+    the same statement, and RETURNING hands back what the response needs. No
+    reload queries are issued. Stock for every line is then reserved in the
+    same transaction, so an order is either placed with its units or not at all.
+    The `order.created` outbox event is written in that transaction too.
+    """
+    order_row = (
+        await session.execute(
+            insert(Order)
+            .values(promo_code=order_in.promo_code)
+            .returning(Order.id, Order.created_at)
+        )
+    ).one()
+
+    quantities = {item.product_id: item.quantity for item in order_in.items}
+    lines = select(
+        literal(order_row.id),
+        Product.id,
+        case(quantities, value=Product.id),
+        Product.price,
+    ).where(Product.id.in_(quantities))
+    line_rows = (
+        await session.execute(
+            insert(OrderProductAssociation)
+            .from_select(
+                ["order_id", "product_id", "quantity", "unit_price"],
+                lines,
+            )
+            .returning(
+                OrderProductAssociation.product_id,
+                OrderProductAssociation.quantity,
+                OrderProductAssociation.unit_price,
+            )
+        )
+    ).all()
+    if len(line_rows) != len(quantities):
+        # raising rolls the caller's transaction or savepoint back, order included
+        raise MissingProductsError(
+            set(quantities).difference(row.product_id for row in line_rows)
+        )
+    await reserve_stock(session=session, quantities=quantities)
+
+    position = {item.product_id: index for index, item in enumerate(order_in.items)}
+    items = sorted(
+        _order_lines(line_rows),
+        key=lambda line: position[line.product_id],
+    )
+    # the triggers have set the same totals on the row, no need to read them back
+    order = schemas.Order(
+        id=order_row.id,
+        promo_code=order_in.promo_code,
+        created_at=order_row.created_at,
+        total=sum(line.quantity * line.unit_price for line in items),
+        item_count=sum(line.quantity for line in items),
+        items=items,
+    )
+    await session.execute(
+        insert(OutboxEvent).values(
+            topic=ORDER_CREATED,
+            aggregate_id=order.id,
+            payload=order.model_dump(mode="json"),
+        )
+    )
+    return order
+
+
+@retry_on_locked
+async def create_order(session: AsyncSession, order_in: OrderCreate) -> schemas.Order:
+    try:
+        order = await add_order(session=session, order_in=order_in)
+    except (MissingProductsError, OutOfStockError):
+        await session.rollback()
+        raise
+    await session.commit()
+    product_cache.invalidate(*(line.product_id for line in order.items))
+    return order
+
+
+@retry_on_locked
+async def add_product_to_orders(
+    session: AsyncSession,
+    promotion: OrdersPromotion,
+) -> int:
+    """
+    Add a line with the promoted product to every qualifying order in one
+    INSERT ... SELECT, without loading orders or line items into Python.
+
+    Orders that already contain the product are skipped. The units for all new
+    lines are reserved in the same transaction with the conditional UPDATE of
+    `reserve_stock`, so a promotion cannot oversell: if the product is short,
+    nothing is added and OutOfStockError is raised. Returns the number of
+    orders that got the product.
+    """
+    already_added = exists().where(
+        OrderProductAssociation.order_id == Order.id,
+        OrderProductAssociation.product_id == promotion.product_id,
+    )
+    qualifying_orders = select(
+        Order.id,
+        literal(promotion.product_id),
+        literal(promotion.quantity),
+        literal(promotion.unit_price),
+    ).where(~already_added)
+    if promotion.promo_code is not None:
+        qualifying_orders = qualifying_orders.where(
+            Order.promo_code == promotion.promo_code
+        )
+    if promotion.created_from is not None:
+        qualifying_orders = qualifying_orders.where(
+            Order.created_at >= promotion.created_from
+        )
+    if promotion.created_to is not None:
+        qualifying_orders = qualifying_orders.where(
+            Order.created_at < promotion.created_to
+        )
+
+    stmt = insert(OrderProductAssociation).from_select(
+        ["order_id", "product_id", "quantity", "unit_price"],
+        qualifying_orders,
+    )
+    orders_affected = (await session.execute(stmt)).rowcount
+    if orders_affected:
+        units = orders_affected * promotion.quantity
+        try:
+            # more units than a 64-bit stock column can hold are never in stock
+            if units >= 2**63:
+                raise OutOfStockError({promotion.product_id})
+            await reserve_stock(
+                session=session, quantities={promotion.product_id: units}
+            )
+        except OutOfStockError:
+            await session.rollback()
+            raise
+    await session.commit()
+    product_cache.invalidate(promotion.product_id)
+    return orders_affected
+
+
+def _revenue_columns():
+    return (
+        func.count(Order.id).label("orders"),
+        func.coalesce(func.sum(Order.item_count), 0).label("items"),
+        func.coalesce(func.sum(Order.total), 0).label("revenue"),
+    )
+
+
+async def get_daily_revenue(
+    session: AsyncSession,
+    filters: OrderFilters | None = None,
+) -> list[schemas.DailyRevenue]:
+    """
+    Orders, items and revenue per calendar day, in one GROUP BY over `orders`.
+    """
+    day = func.date(Order.created_at).label("day")
+    stmt = _filter_orders(
+        select(day, *_revenue_columns()).group_by(day).order_by(day),
+        filters,
+    )
+    result = await session.execute(stmt)
+    return [
+        schemas.DailyRevenue.model_validate(row, from_attributes=True) for row in result
+    ]
+
+
+async def get_promo_code_revenue(
+    session: AsyncSession,
+    filters: OrderFilters | None = None,
+) -> list[schemas.PromoCodeRevenue]:
+    """
+    Orders, items and revenue per promo code, in one GROUP BY over `orders`.
+
+    Without a date range this is a scan of the covering
+    `ix_orders_promo_code_total` index, the table itself is not read.
+    """
+    stmt = _filter_orders(
+        select(Order.promo_code, *_revenue_columns())
+        .group_by(Order.promo_code)
+        .order_by(Order.promo_code),
+        filters,
+    )
+    result = await session.execute(stmt)
+    return [
+        schemas.PromoCodeRevenue.model_validate(row, from_attributes=True)
+        for row in result
+    ]
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import HTTPException, Query, status
+
+from api_v1.pagination import decode_cursor, encode_cursor, is_sqlite_int
+from core.config import settings
+
+from . import schemas
+
+
+class OrderPageParams:
+    """
+    Page size, line items mode and position for the order listing.
+
+    Orders are listed newest first; `cursor` is the `next_cursor` of the
+    previous page and holds the `(created_at, id)` of its last order.
+    """
+
+    def __init__(
+        self,
+        limit: Annotated[
+            int, Query(ge=1, le=settings.pagination.max_limit)
+        ] = settings.pagination.default_limit,
+        lines: schemas.OrderLines = schemas.OrderLines.none,
+        cursor: Annotated[str | None, Query()] = None,
+    ):
+        self.limit = limit
+        self.lines = lines
+        self.after: tuple[datetime, int] | None = None
+        if cursor is not None:
+            self.after = self._cursor_position(cursor)
+
+    @staticmethod
+    def _cursor_position(cursor: str) -> tuple[datetime, int]:
+        values = decode_cursor(cursor)
+        try:
+            created_at, order_id = values
+            if not is_sqlite_int(order_id):
+                raise ValueError(order_id)
+            return datetime.fromisoformat(created_at), order_id
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor!",
+            )
+
+    @staticmethod
+    def next_cursor(position: tuple[datetime, int] | None) -> str | None:
+        if position is None:
+            return None
+        created_at, order_id = position
+        return encode_cursor(created_at.isoformat(), order_id)
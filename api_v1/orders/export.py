@@ -0,0 +1,31 @@
+"""
+NDJSON encoder for the streaming order export.
+
+Orders produced by `crud.stream_orders` are written one per line, and the
+lines are flushed to the response in chunks of `settings.export.chunk_size`.
+"""
+
+from typing import AsyncIterator
+
+from core.config import settings
+from core.models import db_helper
+from . import crud
+from .schemas import OrderFilters
+
+
+async def export_orders(filters: OrderFilters) -> AsyncIterator[str]:
+    # the request-scoped session is closed before a streaming body is sent,
+    # so the export owns its session for as long as the body is being written
+    async with db_helper.read_session_factory() as session:
+        chunk: list[str] = []
+        async for order in crud.stream_orders(
+            session=session,
+            chunk_size=settings.export.chunk_size,
+            filters=filters,
+        ):
+            chunk.append(order.model_dump_json() + "\n")
+            if len(chunk) >= settings.export.chunk_size:
+                yield "".join(chunk)
+                chunk.clear()
+        if chunk:
+            yield "".join(chunk)
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from core.config import settings
+
+
+class OrdersPromotion(BaseModel):
+    # bounded to SQLite's 64-bit integers, larger values cannot be bound
+    product_id: int = Field(ge=1, lt=2**63)
+    quantity: int = Field(default=1, ge=1, lt=2**63)
+    # gifts are free by default
+    unit_price: int = Field(default=0, ge=0, lt=2**63)
+    # which orders qualify; no filter means every order
+    promo_code: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+
+class OrdersPromotionResult(BaseModel):
+    product_id: int
+    orders_affected: int
+
+
+class OrderLineCreate(BaseModel):
+    # bounded to SQLite's 64-bit integers, larger values cannot be bound
+    product_id: int = Field(ge=1, lt=2**63)
+    quantity: int = Field(default=1, ge=1, lt=2**63)
+
+
+class OrderCreate(BaseModel):
+    promo_code: str | None = None
+    items: list[OrderLineCreate] = Field(
+        min_length=1,
+        max_length=settings.orders.max_items,
+    )
+
+    @field_validator("items")
+    @classmethod
+    def one_line_per_product(cls, items: list[OrderLineCreate]):
+        product_ids = [item.product_id for item in items]
+        if len(set(product_ids)) != len(product_ids):
+            raise ValueError("each product may appear only once, use quantity")
+        return items
+
+
+class OrderLine(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    product_id: int
+    quantity: int
+    # price of the product when the order was placed
+    unit_price: int
+
+
+class Order(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    promo_code: str | None
+    created_at: datetime
+    total: int
+    item_count: int
+    # None when the line items were not requested
+    items: list[OrderLine] | None = None
+
+
+class OrderLines(str, Enum):
+    """How the listing loads line items."""
+
+    # orders only
+    none = "none"
+    # one extra `IN` query for the whole page
+    selectin = "selectin"
+    # one flat query, orders outer joined to their lines
+    join = "join"
+
+
+class OrderFilters(BaseModel):
+    # half-open range on created_at
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+
+class OrderPage(BaseModel):
+    items: list[Order]
+    # opaque cursor for the next page, None on the last page
+    next_cursor: str | None = None
+
+
+class RevenueReportRow(BaseModel):
+    orders: int
+    items: int
+    revenue: int
+
+
+class DailyRevenue(RevenueReportRow):
+    day: date
+
+
+class PromoCodeRevenue(RevenueReportRow):
+    # None groups the orders placed without a promo code
+    promo_code: str | None
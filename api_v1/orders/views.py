@@ -0,0 +1,130 @@
+from functools import partial
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api_v1.products import crud as products_crud
+from api_v1.products.cache import product_cache
+from api_v1.products.dependencies import product_not_found
+from core.models import db_helper
+from core.outbox import outbox_dispatcher
+from core.write_coordinator import write_coordinator
+from . import crud
+from .dependencies import OrderPageParams
+from .export import export_orders
+from .schemas import (
+    DailyRevenue,
+    Order,
+    OrderCreate,
+    OrderFilters,
+    OrderPage,
+    OrdersPromotion,
+    OrdersPromotionResult,
+    PromoCodeRevenue,
+)
+
+router = APIRouter(tags=["Orders"])
+
+
+@router.get("/", response_model=OrderPage)
+async def get_orders(
+    filters: Annotated[OrderFilters, Query()],
+    page: OrderPageParams = Depends(),
+    session: AsyncSession = Depends(db_helper.read_scoped_session_dependency),
+):
+    orders, next_after = await crud.get_orders(
+        session=session,
+        limit=page.limit,
+        after=page.after,
+        filters=filters,
+        lines=page.lines,
+    )
+    return OrderPage(items=orders, next_cursor=page.next_cursor(next_after))
+
+
+@router.get("/export/", response_class=StreamingResponse)
+async def export_orders_history(
+    filters: Annotated[OrderFilters, Query()],
+):
+    return StreamingResponse(
+        export_orders(filters=filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="orders.ndjson"'},
+    )
+
+
+@router.get("/reports/revenue/daily/", response_model=list[DailyRevenue])
+async def get_daily_revenue(
+    filters: Annotated[OrderFilters, Query()],
+    session: AsyncSession = Depends(db_helper.read_scoped_session_dependency),
+):
+    return await crud.get_daily_revenue(session=session, filters=filters)
+
+
+@router.get("/reports/revenue/promo-codes/", response_model=list[PromoCodeRevenue])
+async def get_promo_code_revenue(
+    filters: Annotated[OrderFilters, Query()],
+    session: AsyncSession = Depends(db_helper.read_scoped_session_dependency),
+):
+    return await crud.get_promo_code_revenue(session=session, filters=filters)
+
+
+@router.post(
+    "/",
+    response_model=Order,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_order(
+    order_in: OrderCreate,
+    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    try:
+        if write_coordinator.running:
+            order = await write_coordinator.submit(
+                partial(crud.add_order, order_in=order_in)
+            )
+            product_cache.invalidate(*(line.product_id for line in order.items))
+        else:
+            order = await crud.create_order(session=session, order_in=order_in)
+    except crud.MissingProductsError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(error),
+        )
+    except products_crud.OutOfStockError as error:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(error),
+        )
+    # the order.created event is committed, deliver it without waiting for a poll
+    outbox_dispatcher.notify()
+    return order
+
+
+@router.post(
+    "/promotions/add-product/",
+    response_model=OrdersPromotionResult,
+    tags=["Admin"],
+)
+async def add_product_to_orders(
+    promotion: OrdersPromotion,
+    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    if await products_crud.get_product(session, promotion.product_id) is None:
+        raise product_not_found(promotion.product_id)
+    try:
+        orders_affected = await crud.add_product_to_orders(
+            session=session,
+            promotion=promotion,
+        )
+    except products_crud.OutOfStockError as error:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(error),
+        )
+    return OrdersPromotionResult(
+        product_id=promotion.product_id,
+        orders_affected=orders_affected,
+    )
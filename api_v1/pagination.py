@@ -0,0 +1,39 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row of a page, serialized to JSON and
+base64url-encoded, so clients can pass it back without depending on its shape.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+def is_sqlite_int(value: Any) -> bool:
+    """
+    True for a value SQLite can bind as an integer: a 64-bit int, not a bool.
+    """
+    return type(value) is int and -(2**63) <= value < 2**63
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor!",
+        )
+    return values
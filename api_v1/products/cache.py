@@ -0,0 +1,79 @@
+"""
+In-process read-through cache for single products.
+
+Entries are the serialized `schemas.Product` of a row, kept in LRU order and
+dropped after a TTL. Writers invalidate by id, the TTL bounds how stale an entry
+can get when another process changed the row. Entries only come from the
+primary: rows read from a replica may predate the last invalidation.
+"""
+
+from collections import OrderedDict
+from time import monotonic
+
+from core.config import settings
+from .schemas import Product, ProductCacheStats
+
+
+class ProductCache:
+    def __init__(self, max_size: int, ttl_seconds: float, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict[int, tuple[float, Product]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, product_id: int) -> Product | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(product_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, product = entry
+        if expires_at <= monotonic():
+            del self._entries[product_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(product_id)
+        self.hits += 1
+        return product
+
+    def set(self, product: Product) -> None:
+        if not self.enabled or self.max_size <= 0:
+            return
+        self._entries[product.id] = (monotonic() + self.ttl_seconds, product)
+        self._entries.move_to_end(product.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *product_ids: int) -> None:
+        for product_id in product_ids:
+            if self._entries.pop(product_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> ProductCacheStats:
+        return ProductCacheStats(
+            size=len(self._entries),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            invalidations=self.invalidations,
+        )
+
+
+product_cache = ProductCache(
+    max_size=settings.product_cache.max_size,
+    ttl_seconds=settings.product_cache.ttl_seconds,
+    enabled=settings.product_cache.enabled,
+)
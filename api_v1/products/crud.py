@@ -5,49 +5,461 @@ Update
 Delete
 """
 
-from sqlalchemy import select
+import re
+from typing import AsyncIterator, Iterator, Sequence, TypeVar
+
+from sqlalchemy import (
+    Row,
+    Select,
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    tuple_,
+    update,
+)
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.models import Product
+from core.models import Product, TableVersion
+from core.retry import retry_on_locked
+
+from .cache import product_cache
+from .schemas import (
+    BulkItemStatus,
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductCreate,
+    ProductFilters,
+    ProductSort,
+    ProductUpdate,
+    ProductUpdatePartial,
+)
+
+T = TypeVar("T")
+
+# public columns of a product, in response order
+PRODUCT_COLUMNS = ("id", "name", "description", "price", "stock")
+
+
+# sort -> (key column, descending); every order ends with the id tie-breaker
+# and is backed by an index on (key, id), so deep pages seek like the first one
+PRODUCT_SORTS = {
+    ProductSort.id: (None, False),
+    ProductSort.price: (Product.price, False),
+    ProductSort.price_desc: (Product.price, True),
+    ProductSort.name: (Product.name, False),
+}
+
+
+def _sort_keys(sort: ProductSort) -> tuple:
+    key, _ = PRODUCT_SORTS[sort]
+    return (Product.id,) if key is None else (key, Product.id)
+
 
-from .schemas import ProductCreate, ProductUpdate, ProductUpdatePartial
+def _prefix_upper_bound(prefix: str) -> str | None:
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return None
+    return prefix[:-1] + chr(last + 1)
 
 
-async def get_products(session: AsyncSession) -> list[Product]:
-    stmt = select(Product).order_by(Product.id)
+def _filter_products(stmt: Select, filters: ProductFilters | None) -> Select:
+    if filters is None:
+        return stmt
+    if filters.min_price is not None:
+        stmt = stmt.where(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        stmt = stmt.where(Product.price <= filters.max_price)
+    if filters.name_prefix:
+        # a half-open range instead of LIKE 'x%', so the (name, id) index is used
+        stmt = stmt.where(Product.name >= filters.name_prefix)
+        upper_bound = _prefix_upper_bound(filters.name_prefix)
+        if upper_bound is not None:
+            stmt = stmt.where(Product.name < upper_bound)
+    return stmt
+
+
+def _page_products(
+    stmt: Select,
+    limit: int,
+    sort: ProductSort,
+    after: tuple | None,
+) -> Select:
+    _, descending = PRODUCT_SORTS[sort]
+    keys = _sort_keys(sort)
+    if after is not None:
+        position = tuple_(*keys) if len(keys) > 1 else keys[0]
+        last = tuple_(*after) if len(keys) > 1 else after[0]
+        stmt = stmt.where(position < last if descending else position > last)
+    return stmt.order_by(*(key.desc() if descending else key for key in keys)).limit(
+        limit + 1
+    )
+
+
+async def get_products(
+    session: AsyncSession,
+    limit: int,
+    after: tuple | None = None,
+    sort: ProductSort = ProductSort.id,
+    filters: ProductFilters | None = None,
+) -> tuple[list[Product], tuple | None]:
+    """
+    Return one page of products and the sort position to continue after.
+
+    The page is a range scan on the index matching `sort`, so the cost of a
+    request depends on `limit` only, not on the size of the catalog or the page
+    depth. One extra row is fetched to learn whether a next page exists.
+    """
+    stmt = _page_products(
+        _filter_products(select(Product), filters), limit, sort, after
+    )
     result: Result = await session.execute(stmt)
     # ne asiguram ca rezultatul este o lista de obiecte Product
-    products = result.scalars().all()
-    return list(products)
+    products = list(result.scalars().all())
+    if len(products) > limit:
+        del products[limit:]
+        last = products[-1]
+        return products, tuple(getattr(last, key.key) for key in _sort_keys(sort))
+    return products, None
+
+
+async def get_product_rows(
+    session: AsyncSession,
+    fields: Sequence[str],
+    limit: int,
+    after: tuple | None = None,
+    sort: ProductSort = ProductSort.id,
+    filters: ProductFilters | None = None,
+) -> tuple[list[dict], tuple | None]:
+    """
+    Same page as `get_products`, reading only the requested columns.
+
+    Unrequested columns (typically the large `description`) are never fetched,
+    turned into Python objects or encoded. `fields` must include "id".
+    """
+    sort_fields = [key.key for key in _sort_keys(sort)]
+    # the sort key is needed for the next position even if it was not requested
+    columns = [*fields, *(key for key in sort_fields if key not in fields)]
+    stmt = _page_products(
+        _filter_products(
+            select(*(getattr(Product, column) for column in columns)), filters
+        ),
+        limit,
+        sort,
+        after,
+    )
+    result: Result = await session.execute(stmt)
+    rows = [dict(zip(columns, row)) for row in result]
+    next_after = None
+    if len(rows) > limit:
+        del rows[limit:]
+        next_after = tuple(rows[-1][key] for key in sort_fields)
+    if len(columns) > len(fields):
+        for row in rows:
+            for column in columns[len(fields) :]:
+                del row[column]
+    return rows, next_after
+
+
+async def get_sort_position(
+    session: AsyncSession,
+    sort: ProductSort,
+    product_id: int,
+) -> tuple | None:
+    """
+    Sort position of a product, to continue a listing after it.
+    """
+    keys = _sort_keys(sort)
+    if len(keys) == 1:
+        return (product_id,)
+    row = (await session.execute(select(*keys).where(Product.id == product_id))).first()
+    return tuple(row) if row is not None else None
+
+
+async def get_products_version(session: AsyncSession) -> int:
+    """
+    Current value of the products change counter kept up to date by triggers.
+    """
+    version = await session.scalar(
+        select(TableVersion.version).where(TableVersion.table_name == "products")
+    )
+    return version or 0
+
+
+async def stream_products(
+    session: AsyncSession,
+    chunk_size: int,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Walk the whole products table with a server-side cursor.
+
+    Rows are plain tuples (no ORM identity map) and arrive in partitions of
+    `chunk_size`, so memory stays flat regardless of the table size.
+    """
+    stmt = (
+        select(*(getattr(Product, column) for column in PRODUCT_COLUMNS))
+        .order_by(Product.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)
+    async for partition in result.partitions():
+        yield partition
+
+
+products_fts = table("products_fts", column("rowid"))
+
+# name matches weigh more than description matches in the BM25 score
+FTS_COLUMN_WEIGHTS = (10.0, 1.0)
+
+
+def build_fts_query(text: str) -> str | None:
+    """
+    Turn free text into a safe FTS5 query: every word becomes a quoted term,
+    all terms must match, and the last one is a prefix so results follow typing.
+    """
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+async def search_products(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    offset: int = 0,
+) -> tuple[list[Product], int | None]:
+    """
+    Rank products matching `query` by BM25 using the products_fts index.
+    Returns the page and the offset of the next page, if there is one.
+    """
+    rank = func.bm25(literal_column("products_fts"), *FTS_COLUMN_WEIGHTS)
+    stmt = (
+        select(Product)
+        .join(products_fts, products_fts.c.rowid == Product.id)
+        .where(literal_column("products_fts").op("MATCH")(query))
+        .order_by(rank, Product.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    products = list(await session.scalars(stmt))
+    if len(products) > limit:
+        del products[limit:]
+        return products, offset + limit
+    return products, None
 
 
 async def get_product(session: AsyncSession, product_id: int) -> Product | None:
     return await session.get(Product, product_id)
 
 
-async def create_product(session: AsyncSession, product_in: ProductCreate) -> Product:
+async def add_product(session: AsyncSession, product_in: ProductCreate) -> Product:
+    """
+    Unit of work for the write coordinator: insert without committing.
+    """
     product = Product(**product_in.model_dump())
     session.add(product)
+    await session.flush()
+    return product
+
+
+@retry_on_locked
+async def create_product(session: AsyncSession, product_in: ProductCreate) -> Product:
+    product = await add_product(session=session, product_in=product_in)
     await session.commit()
     # await session.refresh(product)
     return product
 
 
+@retry_on_locked
 async def update_product(
     session: AsyncSession,
-    product: Product,
+    product_id: int,
     product_update: ProductUpdate | ProductUpdatePartial,
     partial: bool = False,
-) -> Product:
-    for name, value in product_update.model_dump(exclude_unset=partial).items():
-        setattr(product, name, value)
+) -> Product | None:
+    """
+    Update a product with a single UPDATE ... RETURNING statement.
+
+    Returns None when no row has `product_id`, so no preliminary SELECT is needed.
+    """
+    values = product_update.model_dump(exclude_unset=partial)
+    if not values:
+        # an empty PATCH changes nothing, it only has to prove the row exists
+        return await get_product(session=session, product_id=product_id)
+    stmt = (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(**values)
+        .returning(Product)
+    )
+    product = await session.scalar(stmt)
     await session.commit()
+    product_cache.invalidate(product_id)
     return product
 
 
+class OutOfStockError(Exception):
+    def __init__(self, product_ids: set[int]):
+        self.product_ids = product_ids
+        super().__init__(
+            f"Not enough stock for products: {', '.join(map(str, sorted(product_ids)))}!"
+        )
+
+
+async def reserve_stock(session: AsyncSession, quantities: dict[int, int]) -> None:
+    """
+    Take `quantities` (product id -> units) out of stock, all or nothing.
+
+    One conditional UPDATE decrements every product that still has enough
+    units: the check and the write are the same statement, so concurrent
+    checkouts can never both take the last units. Raises OutOfStockError
+    without committing if any product is short; rolling the caller's
+    transaction back puts the other products' units back.
+    """
+    requested = case(quantities, value=Product.id)
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock >= requested)
+        .values(stock=Product.stock - requested)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    reserved = await session.scalars(stmt)
+    short = set(quantities).difference(reserved)
+    if short:
+        raise OutOfStockError(short)
+
+
+async def release_stock(session: AsyncSession, quantities: dict[int, int]) -> None:
+    """
+    Give units taken by `reserve_stock` back, without committing.
+    """
+    requested = case(quantities, value=Product.id)
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(quantities))
+        .values(stock=Product.stock + requested)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+
+@retry_on_locked
 async def delete_product(
     session: AsyncSession,
-    product: Product,
-) -> None:
-    await session.delete(product)
+    product_id: int,
+) -> bool:
+    """
+    Delete a product with DELETE ... RETURNING; False if it did not exist.
+    """
+    stmt = delete(Product).where(Product.id == product_id).returning(Product.id)
+    deleted_id = await session.scalar(stmt)
+    await session.commit()
+    product_cache.invalidate(product_id)
+    return deleted_id is not None
+
+
+def _batches(items: Sequence[T], batch_size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), batch_size):
+        yield items[start : start + batch_size]
+
+
+@retry_on_locked
+async def bulk_create_products(
+    session: AsyncSession,
+    products_in: Sequence[ProductCreate],
+    batch_size: int,
+) -> list[ProductBulkResult]:
+    """
+    Insert all products in one transaction, one executemany INSERT per batch.
+    """
+    ids: list[int] = []
+    for batch in _batches(products_in, batch_size):
+        # sort_by_parameter_order would make SQLite fall back to one INSERT per
+        # row; rowids of one multi-row INSERT are allocated in VALUES order, so
+        # sorting the returned ids restores the parameter order instead
+        stmt = insert(Product).returning(Product.id)
+        result = await session.execute(stmt, [p.model_dump() for p in batch])
+        ids.extend(sorted(result.scalars().all()))
+    await session.commit()
+    return [
+        ProductBulkResult(index=index, id=product_id, status=BulkItemStatus.created)
+        for index, product_id in enumerate(ids)
+    ]
+
+
+@retry_on_locked
+async def bulk_update_products(
+    session: AsyncSession,
+    products_update: Sequence[ProductBulkUpdate],
+    batch_size: int,
+) -> list[ProductBulkResult]:
+    """
+    Apply partial updates by primary key in one transaction.
+
+    Each batch costs one SELECT to find which ids exist and one executemany
+    UPDATE for those that do; unknown ids are reported as not found, and
+    items carrying nothing but an id as unchanged.
+    """
+    results: list[ProductBulkResult] = []
+    offset = 0
+    for batch in _batches(products_update, batch_size):
+        existing = set(
+            await session.scalars(
+                select(Product.id).where(Product.id.in_({p.id for p in batch}))
+            )
+        )
+        params = []
+        for index, product_update in enumerate(batch, start=offset):
+            values = product_update.model_dump(exclude_unset=True)
+            if product_update.id not in existing:
+                status = BulkItemStatus.not_found
+            elif len(values) == 1:
+                status = BulkItemStatus.unchanged
+            else:
+                status = BulkItemStatus.updated
+                params.append(values)
+            results.append(
+                ProductBulkResult(index=index, id=product_update.id, status=status)
+            )
+        if params:
+            await session.execute(update(Product), params)
+        offset += len(batch)
+    await session.commit()
+    product_cache.invalidate(*(p.id for p in products_update))
+    return results
+
+
+@retry_on_locked
+async def bulk_delete_products(
+    session: AsyncSession,
+    product_ids: Sequence[int],
+    batch_size: int,
+) -> list[ProductBulkResult]:
+    """
+    Delete products by id in one transaction, one DELETE ... RETURNING per batch.
+    """
+    deleted: set[int] = set()
+    for batch in _batches(product_ids, batch_size):
+        stmt = delete(Product).where(Product.id.in_(batch)).returning(Product.id)
+        result = await session.execute(stmt)
+        deleted.update(result.scalars().all())
     await session.commit()
+    product_cache.invalidate(*deleted)
+    return [
+        ProductBulkResult(
+            index=index,
+            id=product_id,
+            status=(
+                BulkItemStatus.deleted
+                if product_id in deleted
+                else BulkItemStatus.not_found
+            ),
+        )
+        for index, product_id in enumerate(product_ids)
+    ]
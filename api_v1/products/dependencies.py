@@ -1,22 +1,183 @@
 from typing import Annotated
 
-from fastapi import Path, Depends, HTTPException, status
+from fastapi import Path, Query, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.models import db_helper, Product
+from api_v1.pagination import decode_cursor, encode_cursor, is_sqlite_int
+from core.config import settings
+from core.models import db_helper
 
 from . import crud
+from . import schemas
+from .cache import product_cache
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor!",
+    )
+
+
+_SORT_KEY_CHECKS = {
+    schemas.ProductSort.price: is_sqlite_int,
+    schemas.ProductSort.price_desc: is_sqlite_int,
+    schemas.ProductSort.name: lambda value: isinstance(value, str),
+}
+
+
+class ProductPageParams:
+    """
+    Page size, order and position for the product listing.
+
+    `cursor` is the opaque `next_cursor` of the previous page; `after_id` is the
+    same position spelled as a plain product id. The cursor wins if both are sent.
+    """
+
+    def __init__(
+        self,
+        limit: Annotated[
+            int, Query(ge=1, le=settings.pagination.max_limit)
+        ] = settings.pagination.default_limit,
+        sort: schemas.ProductSort = schemas.ProductSort.id,
+        after_id: Annotated[int | None, Query(ge=0, lt=2**63)] = None,
+        cursor: Annotated[str | None, Query()] = None,
+    ):
+        self.limit = limit
+        self.sort = sort
+        self.after_id = after_id
+        self.after: tuple | None = None
+        if cursor is not None:
+            self.after = self._cursor_position(cursor)
+
+    def _cursor_position(self, cursor: str) -> tuple:
+        # id order cursors hold [id], other orders hold [sort, key, id]; every
+        # value is checked here because anything else would reach SQLite
+        values = decode_cursor(cursor)
+        if self.sort is schemas.ProductSort.id:
+            if len(values) != 1 or not is_sqlite_int(values[0]):
+                raise _invalid_cursor()
+            return tuple(values)
+        if (
+            len(values) != 3
+            or values[0] != self.sort.value
+            or not _SORT_KEY_CHECKS[self.sort](values[1])
+            or not is_sqlite_int(values[2])
+        ):
+            raise _invalid_cursor()
+        return tuple(values[1:])
+
+    def next_cursor(self, position: tuple | None) -> str | None:
+        if position is None:
+            return None
+        if self.sort is schemas.ProductSort.id:
+            return encode_cursor(*position)
+        return encode_cursor(self.sort.value, *position)
+
+    async def position(self, session: AsyncSession) -> tuple | None:
+        """
+        Keyset position to continue after, resolving `after_id` if needed.
+        """
+        if self.after is not None or self.after_id is None:
+            return self.after
+        position = await crud.get_sort_position(
+            session=session,
+            sort=self.sort,
+            product_id=self.after_id,
+        )
+        if position is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Product {self.after_id} not found!",
+            )
+        return position
+
+
+def offset_from_cursor(cursor: str) -> int:
+    values = decode_cursor(cursor)
+    if len(values) != 1 or not is_sqlite_int(values[0]) or values[0] < 0:
+        raise _invalid_cursor()
+    return values[0]
+
+
+def product_fields(
+    fields: Annotated[
+        str | None,
+        Query(description="Comma separated columns to return, e.g. id,name,price"),
+    ] = None,
+) -> tuple[str, ...] | None:
+    """
+    Parse a sparse fieldset; `id` is always part of it. None means all fields.
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(crud.PRODUCT_COLUMNS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown product fields: {', '.join(sorted(unknown))}!",
+        )
+    return tuple(
+        field for field in crud.PRODUCT_COLUMNS if field in requested or field == "id"
+    )
+
+
+class ProductSearchParams:
+    """
+    Query, page size and position for the full-text search.
+
+    Relevance order has no stable key to seek on, so the opaque cursor wraps
+    an offset into the ranked result.
+    """
+
+    def __init__(
+        self,
+        q: Annotated[str, Query(min_length=1, max_length=200)],
+        limit: Annotated[
+            int, Query(ge=1, le=settings.pagination.max_limit)
+        ] = settings.pagination.default_limit,
+        cursor: Annotated[str | None, Query()] = None,
+    ):
+        self.query = crud.build_fts_query(q)
+        if self.query is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Search query must contain at least one word!",
+            )
+        self.limit = limit
+        self.offset = 0
+        if cursor is not None:
+            self.offset = offset_from_cursor(cursor)
+
+
+def product_not_found(product_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Product {product_id} not found!",
+    )
 
 
 async def product_by_id(
     product_id: Annotated[int, Path],
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
-) -> Product:
-    product = await crud.get_product(session=session, product_id=product_id)
+    session: AsyncSession = Depends(db_helper.read_scoped_session_dependency),
+) -> schemas.Product:
+    """
+    Read a product through the in-process cache, loading it on a miss.
+
+    With a read replica the cache is not filled, the replica takes the reads.
+    """
+    product = product_cache.get(product_id)
     if product is not None:
         return product
 
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Product {product_id} not found!",
-    )
+    product_entity = await crud.get_product(session=session, product_id=product_id)
+    if product_entity is not None:
+        product = schemas.Product.model_validate(product_entity)
+        # a lagging replica could still return the row from before a write that
+        # just invalidated it, and the cache would serve that for a whole TTL
+        if not db_helper.has_replica:
+            product_cache.set(product)
+        return product
+
+    raise product_not_found(product_id)
@@ -0,0 +1,45 @@
+"""
+Strong ETags and conditional GET for product reads.
+
+A single product is tagged with its row version; a listing is tagged with the
+`products` table version plus the query string, so a matching If-None-Match on
+the listing is answered without reading any product row.
+"""
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+from .schemas import Product
+
+
+def product_etag(product: Product, fields: tuple[str, ...] | None = None) -> str:
+    # every representation needs its own strong tag
+    projection = "-" + ".".join(fields) if fields else ""
+    return f'"product-{product.id}-v{product.version}{projection}"'
+
+
+def products_list_etag(table_version: int, request: Request) -> str:
+    query = hashlib.sha1(str(request.query_params).encode()).hexdigest()[:16]
+    return f'"products-v{table_version}-{query}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Evaluate If-None-Match with the weak comparison RFC 9110 requires for GET.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag},
+    )
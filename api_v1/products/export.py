@@ -0,0 +1,61 @@
+"""
+Chunk encoders for the streaming catalog export.
+
+Each encoder turns the partitions produced by `crud.stream_products` into
+response body chunks, one chunk per partition.
+"""
+
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+from core.config import settings
+from core.models import db_helper
+from . import crud
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _ndjson_chunk(rows: Sequence[Row]) -> str:
+    return "".join(
+        json.dumps(dict(zip(crud.PRODUCT_COLUMNS, row)), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows: Sequence[Row], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(crud.PRODUCT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_products(export_format: ExportFormat) -> AsyncIterator[str]:
+    # the request-scoped session is closed before a streaming body is sent,
+    # so the export owns its session for as long as the body is being written
+    async with db_helper.read_session_factory() as session:
+        if export_format is ExportFormat.csv:
+            yield _csv_chunk((), header=True)
+        async for rows in crud.stream_products(
+            session=session,
+            chunk_size=settings.export.chunk_size,
+        ):
+            if export_format is ExportFormat.csv:
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(rows)
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict
+from enum import Enum
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional
 
 
@@ -6,6 +7,8 @@ class ProductBase(BaseModel):
     name: str
     description: str
     price: int
+    # units available to order, taken by crud.reserve_stock
+    stock: int = Field(default=0, ge=0)
 
 
 class ProductCreate(ProductBase):
@@ -13,13 +16,23 @@ class ProductCreate(ProductBase):
 
 
 class ProductUpdate(ProductCreate):
-    pass
+    # PUT replaces the whole product, so leaving stock out must not zero it
+    stock: int = Field(ge=0)
 
 
 class ProductUpdatePartial(ProductCreate):
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[int] = None
+    stock: Optional[int] = Field(default=None, ge=0)
+
+    @field_validator("stock")
+    @classmethod
+    def stock_not_null(cls, stock: Optional[int]):
+        # the default only means "leave unchanged"; the column is NOT NULL
+        if stock is None:
+            raise ValueError("stock may be left out, but not set to null")
+        return stock
 
 
 # from_attributes=True --> poate prelua datele din atributele unui obiect (cum ar fi proprietățile unui obiect dintr-o clasă
@@ -27,3 +40,56 @@ class Product(ProductBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    # row version, used for the ETag only and never written to the body
+    version: int = Field(default=1, exclude=True)
+
+
+class ProductSort(str, Enum):
+    id = "id"
+    price = "price"
+    price_desc = "-price"
+    name = "name"
+
+
+class ProductFilters(BaseModel):
+    # bounded to SQLite's 64-bit integers, larger values cannot be bound
+    min_price: Optional[int] = Field(default=None, ge=-(2**63), lt=2**63)
+    max_price: Optional[int] = Field(default=None, ge=-(2**63), lt=2**63)
+    # case sensitive, matched as an index range on name
+    name_prefix: Optional[str] = Field(default=None, min_length=1, max_length=100)
+
+
+class ProductPage(BaseModel):
+    items: list[Product]
+    # opaque cursor for the next page, None on the last page
+    next_cursor: str | None = None
+
+
+class ProductBulkUpdate(ProductUpdatePartial):
+    id: int
+
+
+class BulkItemStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    # an update item with no field besides id
+    unchanged = "unchanged"
+    deleted = "deleted"
+    not_found = "not_found"
+
+
+class ProductBulkResult(BaseModel):
+    # position of the item in the request body
+    index: int
+    id: int
+    status: BulkItemStatus
+
+
+class ProductCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
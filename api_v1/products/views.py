@@ -1,19 +1,122 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from functools import partial
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api_v1.pagination import encode_cursor
+from api_v1.responses import FastJSONResponse
+from core.config import settings
 from core.models import db_helper
+from core.write_coordinator import write_coordinator
 from . import crud
-from .dependencies import product_by_id
-from .schemas import Product, ProductCreate, ProductUpdate, ProductUpdatePartial
+from .cache import product_cache
+from .dependencies import (
+    product_by_id,
+    product_not_found,
+    product_fields,
+    ProductPageParams,
+    ProductSearchParams,
+)
+from .etags import is_not_modified, not_modified, product_etag, products_list_etag
+from .export import ExportFormat, MEDIA_TYPES, export_products
+from .schemas import (
+    Product,
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductCacheStats,
+    ProductCreate,
+    ProductFilters,
+    ProductPage,
+    ProductUpdate,
+    ProductUpdatePartial,
+)
 
 router = APIRouter(tags=["Products"])
 
 
-@router.get("/", response_model=list[Product])
+@router.get("/", response_model=ProductPage)
 async def get_products(
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+    request: Request,
+    response: Response,
+    filters: Annotated[ProductFilters, Query()],
+    page: ProductPageParams = Depends(),
+    fields: tuple[str, ...] | None = Depends(product_fields),
+    session: AsyncSession = Depends(db_helper.read_scoped_session_dependency),
+):
+    etag = products_list_etag(
+        table_version=await crud.get_products_version(session=session),
+        request=request,
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    after = await page.position(session=session)
+    if fields is None and settings.products_api.fast_json:
+        fields = crud.PRODUCT_COLUMNS
+    if fields is not None:
+        rows, next_after = await crud.get_product_rows(
+            session=session,
+            fields=fields,
+            limit=page.limit,
+            after=after,
+            sort=page.sort,
+            filters=filters,
+        )
+        return FastJSONResponse(
+            content={"items": rows, "next_cursor": page.next_cursor(next_after)},
+            headers={"ETag": etag},
+        )
+
+    response.headers["ETag"] = etag
+    products, next_after = await crud.get_products(
+        session=session,
+        limit=page.limit,
+        after=after,
+        sort=page.sort,
+        filters=filters,
+    )
+    return ProductPage(items=products, next_cursor=page.next_cursor(next_after))
+
+
+@router.get("/search/", response_model=ProductPage)
+async def search_products(
+    search: ProductSearchParams = Depends(),
+    session: AsyncSession = Depends(db_helper.read_scoped_session_dependency),
+):
+    products, next_offset = await crud.search_products(
+        session=session,
+        query=search.query,
+        limit=search.limit,
+        offset=search.offset,
+    )
+    return ProductPage(
+        items=products,
+        next_cursor=encode_cursor(next_offset) if next_offset is not None else None,
+    )
+
+
+@router.get("/export/", response_class=StreamingResponse)
+async def export_products_catalog(
+    format: ExportFormat = ExportFormat.ndjson,
 ):
-    return await crud.get_products(session=session)
+    return StreamingResponse(
+        export_products(export_format=format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="products.{format.value}"',
+        },
+    )
 
 
 @router.post(
@@ -25,46 +128,124 @@ async def create_product(
     product_in: ProductCreate,
     session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ):
+    if write_coordinator.running:
+        return await write_coordinator.submit(
+            partial(crud.add_product, product_in=product_in)
+        )
     return await crud.create_product(session=session, product_in=product_in)
 
 
+@router.post(
+    "/bulk/",
+    response_model=list[ProductBulkResult],
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_products(
+    products_in: Annotated[
+        list[ProductCreate], Body(max_length=settings.bulk.max_items)
+    ],
+    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    return await crud.bulk_create_products(
+        session=session,
+        products_in=products_in,
+        batch_size=settings.bulk.batch_size,
+    )
+
+
+@router.patch("/bulk/", response_model=list[ProductBulkResult])
+async def bulk_update_products(
+    products_update: Annotated[
+        list[ProductBulkUpdate], Body(max_length=settings.bulk.max_items)
+    ],
+    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    return await crud.bulk_update_products(
+        session=session,
+        products_update=products_update,
+        batch_size=settings.bulk.batch_size,
+    )
+
+
+@router.delete("/bulk/", response_model=list[ProductBulkResult])
+async def bulk_delete_products(
+    product_ids: Annotated[list[int], Body(max_length=settings.bulk.max_items)],
+    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    return await crud.bulk_delete_products(
+        session=session,
+        product_ids=product_ids,
+        batch_size=settings.bulk.batch_size,
+    )
+
+
+@router.get("/cache/stats/", response_model=ProductCacheStats)
+async def get_product_cache_stats():
+    return product_cache.stats()
+
+
 @router.get("/{product_id}/", response_model=Product)
 async def get_product(
+    request: Request,
+    response: Response,
     product: Product = Depends(product_by_id),
+    fields: tuple[str, ...] | None = Depends(product_fields),
 ):
+    etag = product_etag(product, fields)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    if fields is not None:
+        return FastJSONResponse(
+            content=product.model_dump(include=set(fields)),
+            headers={"ETag": etag},
+        )
+    if settings.products_api.fast_json:
+        return Response(
+            content=product.model_dump_json(),
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
+    response.headers["ETag"] = etag
     return product
 
 
-@router.put("/{product_id}/")
+@router.put("/{product_id}/", response_model=Product)
 async def update_product(
+    product_id: Annotated[int, Path],
     product_update: ProductUpdate,
-    product: Product = Depends(product_by_id),
     session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ):
-    return await crud.update_product(
+    product = await crud.update_product(
         session=session,
-        product=product,
+        product_id=product_id,
         product_update=product_update,
     )
+    if product is None:
+        raise product_not_found(product_id)
+    return product
 
 
-@router.patch("/{product_id}/")
+@router.patch("/{product_id}/", response_model=Product)
 async def update_product_partial(
+    product_id: Annotated[int, Path],
     product_update: ProductUpdatePartial,
-    product: Product = Depends(product_by_id),
     session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ):
-    return await crud.update_product(
+    product = await crud.update_product(
         session=session,
-        product=product,
+        product_id=product_id,
         product_update=product_update,
         partial=True,
     )
+    if product is None:
+        raise product_not_found(product_id)
+    return product
 
 
 @router.delete("/{product_id}/", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
-    product: Product = Depends(product_by_id),
+    product_id: Annotated[int, Path],
     session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ) -> None:
-    await crud.delete_product(session=session, product=product)
+    if not await crud.delete_product(session=session, product_id=product_id):
+        raise product_not_found(product_id)
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded by pydantic-core in one pass straight to bytes.
+
+    Meant for content that is already plain dicts/lists/scalars, it skips
+    FastAPI's jsonable_encoder walk and the stdlib json module.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -0,0 +1,109 @@
+"""
+Query plan and constraint checks for the order line indexes.
+
+Builds the schema from the models, then asserts with EXPLAIN QUERY PLAN that
+the lookups on `order_product_association_table` search an index instead of
+scanning the table, and that a duplicate (order_id, product_id) line is
+rejected. `alembic check` keeps the migrations in step with these models.
+Run from the repository root:
+
+    python -m benchmarks.order_line_indexes
+"""
+
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import Select, exists, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from core.models import Base, Order, OrderProductAssociation, Product
+
+UNIQUE_INDEX = "index_unique_order_product"
+PRODUCT_INDEX = "ix_order_product_association_table_product_id"
+
+CHECKS: dict[str, tuple[Select, str]] = {
+    # what selectinload(Order.product_details) emits for a page of orders
+    "lines of a page of orders": (
+        select(OrderProductAssociation).where(
+            OrderProductAssociation.order_id.in_([1, 2, 3])
+        ),
+        UNIQUE_INDEX,
+    ),
+    "orders containing a product": (
+        select(OrderProductAssociation.order_id).where(
+            OrderProductAssociation.product_id == 1
+        ),
+        PRODUCT_INDEX,
+    ),
+    # the NOT EXISTS probe of crud.add_product_to_orders
+    "line of a product in an order": (
+        select(Order.id).where(
+            ~exists().where(
+                OrderProductAssociation.order_id == Order.id,
+                OrderProductAssociation.product_id == 1,
+            )
+        ),
+        UNIQUE_INDEX,
+    ),
+}
+
+
+async def query_plan(conn: AsyncConnection, stmt: Select) -> list[str]:
+    sql = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+    return [row.detail for row in result]
+
+
+async def main(lines: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'plans.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(Product),
+                [
+                    {"name": f"Product {i}", "description": "", "price": i}
+                    for i in range(100)
+                ],
+            )
+            await conn.execute(insert(Order), [{} for _ in range(lines // 10)])
+            await conn.execute(
+                insert(OrderProductAssociation),
+                [
+                    {"order_id": i // 10 + 1, "product_id": i % 10 + 1}
+                    for i in range(lines)
+                ],
+            )
+            await conn.exec_driver_sql("ANALYZE")
+
+            for name, (stmt, index) in CHECKS.items():
+                plan = await query_plan(conn, stmt)
+                print(f"{name:>30}: {' | '.join(plan)}")
+                line_steps = [
+                    step for step in plan if "order_product_association_table" in step
+                ]
+                assert line_steps, plan
+                assert all(
+                    step.startswith("SEARCH") and index in step for step in line_steps
+                ), plan
+
+        async with engine.connect() as conn:
+            try:
+                await conn.execute(
+                    insert(OrderProductAssociation).values(order_id=1, product_id=1)
+                )
+            except IntegrityError:
+                print(f"{'duplicate line':>30}: rejected by {UNIQUE_INDEX}")
+            else:
+                raise AssertionError("duplicate (order_id, product_id) was accepted")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(lines=args.lines))
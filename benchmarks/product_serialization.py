@@ -0,0 +1,100 @@
+"""
+Per-row cost of serving a page of GET /api/v1/products/, default vs fast path.
+
+default: ORM entities -> ProductPage -> FastAPI's serialize_response
+         (response_model validation + dump) -> JSONResponse (stdlib json)
+fast:    row tuples -> dicts -> FastJSONResponse (pydantic-core to_json)
+
+Both paths include the query. Run from the repository root:
+
+    python -m benchmarks.product_serialization --rows 20000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from api_v1.products import crud
+from api_v1.products.schemas import ProductPage
+from api_v1.responses import FastJSONResponse
+from core.models import Product
+
+response_field = create_model_field(
+    name="Response_get_products",
+    type_=ProductPage,
+    mode="serialization",
+)
+
+
+async def default_path(session, rows: int) -> bytes:
+    products, _ = await crud.get_products(session=session, limit=rows)
+    content = await serialize_response(
+        field=response_field,
+        response_content=ProductPage(items=products, next_cursor=None),
+    )
+    return JSONResponse(content=content).body
+
+
+async def fast_path(session, rows: int) -> bytes:
+    items, _ = await crud.get_product_rows(
+        session=session,
+        fields=crud.PRODUCT_COLUMNS,
+        limit=rows,
+    )
+    return FastJSONResponse(content={"items": items, "next_cursor": None}).body
+
+
+async def measure(session_factory, path, rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # a fresh session per run, like a request, so the identity map is empty
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await path(session, rows)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Product.__table__.create)
+            await conn.execute(
+                insert(Product),
+                [
+                    {
+                        "name": f"Product {i}",
+                        "description": f"Description of product {i} " * 8,
+                        "price": i % 1000,
+                    }
+                    for i in range(rows)
+                ],
+            )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        results = {}
+        for name, path in (("default", default_path), ("fast", fast_path)):
+            results[name] = await measure(session_factory, path, rows, repeat)
+            print(
+                f"{name:>8}: {results[name] * 1000:8.1f} ms/page "
+                f"{results[name] / rows * 1e6:6.2f} us/row"
+            )
+        print(f" speedup: {results['default'] / results['fast']:.1f}x")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(rows=args.rows, repeat=args.repeat))
@@ -0,0 +1,80 @@
+"""
+Routing checks for the read-replica engine against real database files.
+
+Creates a primary database, copies it to a replica file with the sqlite3
+backup API, then writes to the primary only. Asserts that the read sessions of
+a `DatabaseHelper` with a `read_url` see the replica, that writes go to the
+primary, and that the read engine refuses writes (query_only). Run from the
+repository root:
+
+    python -m benchmarks.read_replica
+"""
+
+import asyncio
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from api_v1.products import crud
+from api_v1.products.schemas import ProductCreate
+from core.config import settings
+from core.models import Base, Product
+from core.models.db_helper import DatabaseHelper
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        primary, replica = Path(tmp) / "primary.db", Path(tmp) / "replica.db"
+        helper = DatabaseHelper(
+            url=f"sqlite+aiosqlite:///{primary}",
+            read_url=f"sqlite+aiosqlite:///{replica}",
+            echo=False,
+            pragmas=settings.db.pragmas.model_dump(exclude_none=True),
+        )
+        assert helper.has_replica and len(helper.engines) == 2
+
+        async with helper.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(Product), [{"name": "Replicated", "description": "", "price": 1}]
+            )
+        # the backup API includes pages still in the -wal file, a file copy does not
+        with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+            source.backup(target)
+
+        async with helper.session_factory() as session:
+            await crud.create_product(
+                session=session,
+                product_in=ProductCreate(name="Primary only", description="", price=2),
+            )
+
+        async with helper.read_session_factory() as session:
+            products, _ = await crud.get_products(session=session, limit=10)
+            names = [product.name for product in products]
+            print(f"  replica reads: {names}")
+            assert names == ["Replicated"], names
+            try:
+                await session.execute(
+                    insert(Product).values(name="Rejected", description="", price=3)
+                )
+            except OperationalError as error:
+                print(f" replica writes: rejected ({error.orig})")
+            else:
+                raise AssertionError("the read engine accepted a write")
+
+        async with helper.session_factory() as session:
+            names = list(
+                await session.scalars(select(Product.name).order_by(Product.id))
+            )
+            print(f"  primary reads: {names}")
+            assert names == ["Replicated", "Primary only"], names
+
+        for engine in helper.engines:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Contention stress test for stock reservation: parallel checkouts of one SKU.
+
+Every checkout orders `--quantity` units of a product that has `--stock` units.
+Exactly `stock // quantity` checkouts may succeed, every other one must fail
+with OutOfStockError, and stock must never go negative. Runs once through the
+write coordinator and once with one session per checkout (retry_on_locked).
+Run from the repository root:
+
+    python -m benchmarks.stock_contention --checkouts 500 --stock 200
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from api_v1.orders import crud
+from api_v1.orders.schemas import OrderCreate, OrderLineCreate
+from api_v1.products.crud import OutOfStockError
+from core.config import settings
+from core.models import Base, Order, Product
+from core.models.db_helper import DatabaseHelper
+from core.write_coordinator import WriteCoordinator
+
+
+async def checkout_with_coordinator(helper, coordinator, order_in) -> None:
+    await coordinator.submit(partial(crud.add_order, order_in=order_in))
+
+
+async def checkout_with_session(helper, coordinator, order_in) -> None:
+    async with helper.session_factory() as session:
+        await crud.create_order(session=session, order_in=order_in)
+
+
+async def run(path, checkouts: int, stock: int, quantity: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        helper = DatabaseHelper(
+            url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}",
+            echo=False,
+            pool_size=20,
+            max_overflow=0,
+            pool_timeout=120,
+            pragmas=settings.db.pragmas.model_dump(exclude_none=True),
+        )
+        async with helper.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with helper.session_factory() as session:
+            product = Product(
+                name="SKU", description="flash sale", price=100, stock=stock
+            )
+            session.add(product)
+            await session.commit()
+            product_id = product.id
+
+        coordinator = WriteCoordinator(
+            session_factory=helper.session_factory,
+            max_batch_size=settings.write_coordinator.max_batch_size,
+            max_delay_ms=settings.write_coordinator.max_delay_ms,
+        )
+        await coordinator.start()
+        order_in = OrderCreate(
+            items=[OrderLineCreate(product_id=product_id, quantity=quantity)]
+        )
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(path(helper, coordinator, order_in) for _ in range(checkouts)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+        await coordinator.stop()
+
+        placed = sum(result is None for result in results)
+        out_of_stock = sum(isinstance(result, OutOfStockError) for result in results)
+        errors = [
+            result
+            for result in results
+            if result is not None and not isinstance(result, OutOfStockError)
+        ]
+        async with helper.session_factory() as session:
+            left = await session.scalar(
+                select(Product.stock).where(Product.id == product_id)
+            )
+            orders = await session.scalar(select(func.count(Order.id)))
+        await helper.engine.dispose()
+
+    expected = min(checkouts, stock // quantity)
+    print(
+        f"{path.__name__:>26}: {checkouts / elapsed:7.0f} checkouts/s "
+        f"placed={placed} out_of_stock={out_of_stock} errors={len(errors)} "
+        f"orders={orders} stock_left={left}"
+    )
+    assert not errors, errors[:3]
+    assert placed == orders == expected, (placed, orders, expected)
+    assert left == stock - expected * quantity >= 0, left
+
+
+async def main(checkouts: int, stock: int, quantity: int) -> None:
+    for path in (checkout_with_coordinator, checkout_with_session):
+        await run(path, checkouts=checkouts, stock=stock, quantity=quantity)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=200)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(
+        main(checkouts=args.checkouts, stock=args.stock, quantity=args.quantity)
+    )
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
@@ -6,9 +7,125 @@ BASE_DIR = Path(__file__).parent.parent
 DB_PATH: str = BASE_DIR / "test.db"
 
 
+class SqlitePragmas(BaseModel):
+    # applied in this order on every new DBAPI connection, None leaves
+    # SQLite's default in place
+    busy_timeout: int | None = None
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    cache_size: int | None = None
+    mmap_size: int | None = None
+
+    @classmethod
+    def production(cls) -> "SqlitePragmas":
+        # WAL lets readers run next to the single writer; NORMAL sync is durable
+        # in WAL mode except for the last commits on power loss
+        return cls(
+            busy_timeout=5000,
+            journal_mode="wal",
+            synchronous="normal",
+            cache_size=-64_000,
+            mmap_size=256 * 1024 * 1024,
+        )
+
+
 class DbSettings(BaseModel):
     url: str = f"sqlite+aiosqlite:///{DB_PATH}"
-    echo: bool = True
+    # read-only replica for catalog reads and reports, e.g. a copy of test.db
+    # opened as "sqlite+aiosqlite:///file:replica.db?mode=ro&uri=true";
+    # None sends reads to `url`
+    read_url: str | None = None
+    # formats and logs every statement synchronously, for local debugging only;
+    # see SlowQueryLogSettings for production
+    echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    # request sessions open longer than this are reported as overdue
+    session_deadline_seconds: float = 30.0
+    pragmas: SqlitePragmas = SqlitePragmas.production()
+
+
+class PaginationSettings(BaseModel):
+    default_limit: int = 50
+    # hard cap: no single page may ask the database for more rows than this
+    max_limit: int = 200
+
+
+class ExportSettings(BaseModel):
+    # rows fetched from the server-side cursor and written per response chunk
+    chunk_size: int = 1000
+
+
+class BulkSettings(BaseModel):
+    # rows sent to the database per executemany statement
+    batch_size: int = 500
+    max_items: int = 50_000
+
+
+class ProductCacheSettings(BaseModel):
+    enabled: bool = True
+    max_size: int = 10_000
+    ttl_seconds: float = 30.0
+
+
+class ProductsApiSettings(BaseModel):
+    # serve product reads from row tuples encoded by pydantic-core, skipping
+    # ORM entities, response_model revalidation and jsonable_encoder
+    fast_json: bool = False
+
+
+class InstrumentationSettings(BaseModel):
+    enabled: bool = True
+    # the same statement shape this many times in one request is reported
+    n_plus_one_threshold: int = 10
+    n_plus_one_action: Literal["warn", "raise"] = "warn"
+    # requests kept for GET /api/v1/debug/queries/
+    history_size: int = 100
+
+
+class SlowQueryLogSettings(BaseModel):
+    enabled: bool = True
+    threshold_ms: float = 100.0
+    # fraction of statements under the threshold that are logged too
+    sample_rate: float = 0.0
+    # log parameter types instead of values
+    redact_params: bool = True
+    # attach EXPLAIN QUERY PLAN to statements over the threshold
+    explain: bool = True
+
+
+class LockRetrySettings(BaseModel):
+    # total tries of a unit of work that keeps failing with "database is locked"
+    max_attempts: int = 5
+    base_delay_ms: float = 10.0
+    max_delay_ms: float = 500.0
+
+
+class WriteCoordinatorSettings(BaseModel):
+    enabled: bool = True
+    # a group is committed when it reaches this size or after max_delay_ms
+    max_batch_size: int = 64
+    max_delay_ms: float = 2.0
+
+
+class OutboxSettings(BaseModel):
+    enabled: bool = True
+    # events handed to the sink per delivery
+    batch_size: int = 100
+    # how often the table is checked when nothing wakes the dispatcher
+    poll_interval_ms: float = 1000.0
+    # longest wait before retrying after a failed delivery
+    max_backoff_ms: float = 30_000.0
+    sink: Literal["file", "memory"] = "file"
+    # NDJSON file the file sink appends to
+    file_path: Path = BASE_DIR / "outbox_events.ndjson"
+
+
+class OrdersSettings(BaseModel):
+    max_items: int = 500
 
 
 class Auth_JWT(BaseModel):
@@ -22,6 +139,17 @@ class Auth_JWT(BaseModel):
 class Settings(BaseSettings):
     api_v1_prefix: str = "/api/v1"
     db: DbSettings = DbSettings()
+    pagination: PaginationSettings = PaginationSettings()
+    export: ExportSettings = ExportSettings()
+    bulk: BulkSettings = BulkSettings()
+    product_cache: ProductCacheSettings = ProductCacheSettings()
+    products_api: ProductsApiSettings = ProductsApiSettings()
+    instrumentation: InstrumentationSettings = InstrumentationSettings()
+    slow_query_log: SlowQueryLogSettings = SlowQueryLogSettings()
+    lock_retry: LockRetrySettings = LockRetrySettings()
+    write_coordinator: WriteCoordinatorSettings = WriteCoordinatorSettings()
+    orders: OrdersSettings = OrdersSettings()
+    outbox: OutboxSettings = OutboxSettings()
     auth_jwt: Auth_JWT = Auth_JWT()
 
 
@@ -0,0 +1,168 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor events on the engines count statements, time them and group them by
+shape (the SQL text with expanded parameter lists collapsed). The numbers are
+collected for the request running in the current context. They are sent back
+as a Server-Timing header, kept in a short history for the debug endpoint and
+checked for N+1 patterns: one statement shape repeated many times within a
+single request.
+"""
+
+import logging
+import re
+import warnings
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Iterator, Literal
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" and multi-row "VALUES (?, ?), (?, ?)" differ only by length
+_EXPANDED_PARAMS = re.compile(r"\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))*")
+
+
+def statement_shape(statement: str) -> str:
+    return _EXPANDED_PARAMS.sub("(?...)", " ".join(statement.split()))
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+class QueryStats:
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.statements = 0
+        self.db_time = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {
+            shape: count for shape, count in self.shapes.items() if count >= threshold
+        }
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} queries"'
+
+    def as_dict(self, threshold: int) -> dict:
+        return {
+            "label": self.label,
+            "statements": self.statements,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "repeated": self.repeated(threshold),
+        }
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class QueryInstrumentation:
+    def __init__(
+        self,
+        n_plus_one_threshold: int = 10,
+        n_plus_one_action: Literal["warn", "raise"] = "warn",
+        history_size: int = 100,
+    ):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.n_plus_one_action = n_plus_one_action
+        self.history: deque[dict] = deque(maxlen=history_size)
+
+    def install(self, *engines: AsyncEngine) -> None:
+        for engine in engines:
+            sync_engine = engine.sync_engine
+            if event.contains(sync_engine, "before_cursor_execute", _before_execute):
+                continue
+            event.listen(sync_engine, "before_cursor_execute", _before_execute)
+            event.listen(sync_engine, "after_cursor_execute", _after_execute)
+
+    @contextmanager
+    def track(self, label: str = "") -> Iterator[QueryStats]:
+        """
+        Collect the statements run in this context; usable around a request or
+        inside a test, where `n_plus_one_action="raise"` turns a warning into a failure.
+        """
+        stats = QueryStats(label=label)
+        token = _current_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_stats.reset(token)
+        self.history.append(stats.as_dict(self.n_plus_one_threshold))
+        self.check(stats)
+
+    def check(self, stats: QueryStats) -> None:
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        if not repeated:
+            return
+        message = f"Possible N+1 in {stats.label or 'block'}: " + "; ".join(
+            f"{count}x {shape[:120]}" for shape, count in repeated.items()
+        )
+        if self.n_plus_one_action == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+        warnings.warn(message, RuntimeWarning, stacklevel=2)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, which is dropped with the statement; a
+    # statement that raises never reaches _after_execute
+    context._query_started_at = perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    # the BEGIN emitted by DatabaseHelper.own_transactions is not a query
+    if stats is not None and statement != "BEGIN":
+        stats.record(statement, perf_counter() - context._query_started_at)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware tracking the statements of each HTTP request and adding
+    them to the response as a Server-Timing header.
+    """
+
+    def __init__(self, app, instrumentation: QueryInstrumentation):
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        with self.instrumentation.track(label=label) as stats:
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (b"server-timing", stats.server_timing().encode("latin-1"))
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+query_instrumentation = QueryInstrumentation(
+    n_plus_one_threshold=settings.instrumentation.n_plus_one_threshold,
+    n_plus_one_action=settings.instrumentation.n_plus_one_action,
+    history_size=settings.instrumentation.history_size,
+)
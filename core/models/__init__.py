@@ -8,6 +8,8 @@ __all__ = (
     "Profile",
     "Order",
     "OrderProductAssociation",
+    "TableVersion",
+    "OutboxEvent",
 )
 
 from .base import Base
@@ -18,3 +20,5 @@ from .post import Post
 from .profile import Profile
 from .order import Order
 from .order_product_association import OrderProductAssociation
+from .table_version import TableVersion
+from .outbox_event import OutboxEvent
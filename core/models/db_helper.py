@@ -1,6 +1,9 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator
 from asyncio import current_task
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
@@ -8,39 +11,195 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from core.config import settings
+from .session_lifecycle import MeteredQueuePool, SessionTracker
 
 
 class DatabaseHelper:
-    def __init__(self, url: str, echo: bool = True):
-        self.engine = create_async_engine(
-            url=url,
+    def __init__(
+        self,
+        url: str,
+        echo: bool = True,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        pragmas: dict[str, Any] | None = None,
+        read_url: str | None = None,
+        session_deadline_seconds: float = 30.0,
+    ):
+        self.engine_options = dict(
             echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
         )
+        pragmas = pragmas or {}
+        self.engine = self.create_engine(url=url, pragmas=pragmas)
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
-
-    def get_scoped_session(self):
-        return async_scoped_session(
+        # reads go to the replica when there is one; the journal mode belongs
+        # to the database file and is set by the writer, query_only guards the
+        # read engine against writes even if it points at the primary file
+        if read_url is None:
+            self.read_engine = self.engine
+        else:
+            read_pragmas = {
+                name: value for name, value in pragmas.items() if name != "journal_mode"
+            }
+            read_pragmas["query_only"] = 1
+            self.read_engine = self.create_engine(url=read_url, pragmas=read_pragmas)
+        self.read_session_factory = async_sessionmaker(
+            bind=self.read_engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+        # one registry per engine for the life of the app, sessions are keyed
+        # by request task and removed from it when the request ends
+        self.scoped_session = async_scoped_session(
             session_factory=self.session_factory,
             scopefunc=current_task,
         )
+        self.read_scoped_session = async_scoped_session(
+            session_factory=self.read_session_factory,
+            scopefunc=current_task,
+        )
+        self.session_tracker = SessionTracker(deadline_seconds=session_deadline_seconds)
+
+    @property
+    def has_replica(self) -> bool:
+        return self.read_engine is not self.engine
+
+    @property
+    def engines(self) -> tuple[AsyncEngine, ...]:
+        if not self.has_replica:
+            return (self.engine,)
+        return self.engine, self.read_engine
+
+    def create_engine(self, url: str, pragmas: dict[str, Any]) -> AsyncEngine:
+        engine = create_async_engine(
+            url=url,
+            poolclass=MeteredQueuePool,
+            **self.engine_options,
+        )
+        if engine.dialect.name == "sqlite":
+            self.own_transactions(engine)
+        if pragmas:
+            event.listen(
+                engine.sync_engine,
+                "connect",
+                self.pragmas_listener(pragmas),
+            )
+        return engine
+
+    @staticmethod
+    def own_transactions(engine: AsyncEngine) -> None:
+        """
+        Let SQLAlchemy emit BEGIN itself instead of the sqlite3 driver.
+
+        The driver only opens a transaction right before a DML statement, so a
+        SAVEPOINT ran outside any transaction and its RELEASE committed. This
+        is SQLAlchemy's documented fix for SAVEPOINT support on pysqlite.
+        """
+
+        def disable_driver_transactions(dbapi_connection, connection_record) -> None:
+            dbapi_connection.isolation_level = None
+
+        def begin(connection) -> None:
+            connection.exec_driver_sql("BEGIN")
+
+        event.listen(engine.sync_engine, "connect", disable_driver_transactions)
+        event.listen(engine.sync_engine, "begin", begin)
+
+    @staticmethod
+    def pragmas_listener(pragmas: dict[str, Any]):
+        """
+        Build a "connect" listener running the PRAGMAs on each new connection.
+        """
+
+        def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+        return set_sqlite_pragmas
+
+    def get_scoped_session(self):
+        return self.scoped_session
+
+    def get_read_scoped_session(self):
+        return self.read_scoped_session
 
     async def session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
-            yield session
-            await session.close()
+            self.session_tracker.opened(session)
+            try:
+                yield session
+            finally:
+                self.session_tracker.closed(session)
 
     async def scoped_session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
-        session = self.get_scoped_session()
-        yield session
-        await session.close()
+        async with self._scoped_session_lifecycle(self.scoped_session) as session:
+            yield session
+
+    async def read_scoped_session_dependency(
+        self,
+    ) -> AsyncGenerator[AsyncSession, None]:
+        async with self._scoped_session_lifecycle(self.read_scoped_session) as session:
+            yield session
+
+    @asynccontextmanager
+    async def _scoped_session_lifecycle(
+        self,
+        registry: async_scoped_session,
+    ) -> AsyncIterator[AsyncSession]:
+        # a context manager, not a generator: an exception thrown into the
+        # dependency must run this cleanup now, in the request's own task,
+        # because the registry is keyed by that task
+        session = registry()
+        self.session_tracker.opened(session)
+        try:
+            yield session
+        except BaseException:
+            # do not hand a failed write transaction back to the pool
+            await session.rollback()
+            raise
+        finally:
+            # remove() closes the session and drops the task's registry entry
+            await registry.remove()
+            self.session_tracker.closed(session)
+
+    def metrics(self) -> dict:
+        engines = {"write": self.engine}
+        if self.read_engine is not self.engine:
+            engines["read"] = self.read_engine
+        return {
+            "pools": {
+                name: engine.pool.stats()
+                for name, engine in engines.items()
+                if isinstance(engine.pool, MeteredQueuePool)
+            },
+            "sessions": self.session_tracker.stats(),
+        }
 
 
 db_helper = DatabaseHelper(
     url=settings.db.url,
     echo=settings.db.echo,
+    pool_size=settings.db.pool_size,
+    max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    pool_recycle=settings.db.pool_recycle,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    pragmas=settings.db.pragmas.model_dump(exclude_none=True),
+    read_url=settings.db.read_url,
+    session_deadline_seconds=settings.db.session_deadline_seconds,
 )
@@ -1,7 +1,7 @@
 from .base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import Index, text
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -11,11 +11,23 @@ if TYPE_CHECKING:
 
 class Order(Base):
     __tablename__ = "orders"
+    # keyset order of the listing, also serves created_at range filters
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # covers the per promo code revenue report
+        Index("ix_orders_promo_code_total", "promo_code", "total", "item_count"),
+    )
     promo_code: Mapped[str | None]
+    # both defaults write the text format SQLAlchemy stores datetimes in, so
+    # every row compares correctly against a keyset cursor
     created_at: Mapped[datetime] = mapped_column(
-        server_default=func.now(),
+        server_default=text("(strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))"),
         default=datetime.now,
     )
+    # sum of quantity * unit_price and of quantity over the line items, kept
+    # up to date by the order_lines_totals_* triggers
+    total: Mapped[int] = mapped_column(default=0, server_default="0")
+    item_count: Mapped[int] = mapped_column(default=0, server_default="0")
     # products: Mapped[list["Product"]] = relationship(
     #     secondary="order_product_association_table",
     #     back_populates="orders",
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 from typing import TYPE_CHECKING
@@ -16,14 +16,19 @@ Un product poate apărea în multe orders
 
 class OrderProductAssociation(Base):
     __tablename__ = "order_product_association_table"
-    __table_args__ = tuple(
-        UniqueConstraint("order_id", "product_id", name="index_unique_order_product")
+    # a unique index rather than a table constraint: SQLite can add it in place,
+    # without the batch rebuild that would drop the table's triggers.
+    # It also serves lookups by order_id as its leading column
+    __table_args__ = (
+        Index("index_unique_order_product", "order_id", "product_id", unique=True),
     )
     id: Mapped[int] = mapped_column(primary_key=True)
 
     order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False)
 
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id"), nullable=False, index=True
+    )
 
     quantity: Mapped[int] = mapped_column(default=1, server_default="1")
 
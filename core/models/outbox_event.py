@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Event waiting to be delivered to the consumers, written in the same
+    transaction as the change it describes.
+
+    `core.outbox.OutboxDispatcher` reads the table in id order and deletes
+    events once the sink has accepted them.
+    """
+
+    __tablename__ = "outbox"
+    # delivered rows are deleted, AUTOINCREMENT keeps their ids from coming back
+    __table_args__ = {"sqlite_autoincrement": True}
+    topic: Mapped[str] = mapped_column(String(64))
+    aggregate_id: Mapped[int]
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        default=datetime.now,
+    )
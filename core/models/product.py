@@ -1,5 +1,6 @@
 from .base import Base
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -9,9 +10,17 @@ if TYPE_CHECKING:
 
 class Product(Base):
     __tablename__ = "products"
+    # keyset-friendly orders for the listing: each sort key plus the id tie-breaker
+    __table_args__ = (
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_name_id", "name", "id"),
+    )
     name: Mapped[str]
     price: Mapped[int]
     description: Mapped[str]
+    stock: Mapped[int] = mapped_column(default=0, server_default="0")
+    # bumped by the products_version_bump trigger whenever a data column changes
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
 
     # orders: Mapped[list["Order"]] = relationship(
     #     secondary="order_product_association_table", back_populates="products"
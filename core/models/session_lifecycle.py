@@ -0,0 +1,97 @@
+"""
+Connection pool and session bookkeeping for capacity planning.
+
+`MeteredQueuePool` times every checkout, including the wait for a free
+connection. `SessionTracker` follows request sessions from open to close and
+reports the ones still open past a deadline, which usually means a leak or a
+request stuck holding a connection.
+"""
+
+import asyncio
+import logging
+from time import monotonic, perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+logger = logging.getLogger(__name__)
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = perf_counter()
+        connection = super().connect()
+        waited = perf_counter() - started
+        self.checkouts += 1
+        self.checkout_wait_total += waited
+        self.checkout_wait_max = max(self.checkout_wait_max, waited)
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "checkout_wait_avg_ms": round(
+                (
+                    self.checkout_wait_total / self.checkouts * 1000
+                    if self.checkouts
+                    else 0
+                ),
+                3,
+            ),
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+        }
+
+
+class SessionTracker:
+    def __init__(self, deadline_seconds: float):
+        self.deadline_seconds = deadline_seconds
+        self._open: dict[int, tuple[float, str]] = {}
+        self.opened_total = 0
+        self.closed_total = 0
+        self.closed_overdue = 0
+        self.max_lifetime = 0.0
+
+    def opened(self, session: AsyncSession) -> None:
+        task = asyncio.current_task()
+        self._open[id(session)] = (monotonic(), task.get_name() if task else "")
+        self.opened_total += 1
+
+    def closed(self, session: AsyncSession) -> None:
+        opened_at, owner = self._open.pop(id(session), (None, ""))
+        if opened_at is None:
+            return
+        lifetime = monotonic() - opened_at
+        self.closed_total += 1
+        self.max_lifetime = max(self.max_lifetime, lifetime)
+        if lifetime > self.deadline_seconds:
+            self.closed_overdue += 1
+            logger.warning("Session of %s was open for %.1fs", owner, lifetime)
+
+    def overdue(self) -> list[dict]:
+        now = monotonic()
+        return [
+            {"owner": owner, "open_for_s": round(now - opened_at, 3)}
+            for opened_at, owner in self._open.values()
+            if now - opened_at > self.deadline_seconds
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "open": len(self._open),
+            "opened_total": self.opened_total,
+            "closed_total": self.closed_total,
+            "closed_overdue": self.closed_overdue,
+            "max_lifetime_ms": round(self.max_lifetime * 1000, 3),
+            "deadline_s": self.deadline_seconds,
+            "overdue": self.overdue(),
+        }
@@ -0,0 +1,16 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class TableVersion(Base):
+    """
+    Change counter per table, bumped by database triggers on every row change.
+
+    Lets a reader find out whether a table changed without scanning it.
+    """
+
+    __tablename__ = "table_versions"
+    table_name: Mapped[str] = mapped_column(String(64), unique=True)
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
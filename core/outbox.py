@@ -0,0 +1,234 @@
+"""
+Transactional outbox dispatcher.
+
+Writers insert an `OutboxEvent` in the same transaction as the change it
+describes, so an event exists if and only if the change was committed. A
+background task reads the outbox in id order, hands each batch to a sink and
+deletes the batch once the sink accepted it. A crash or a failed delete
+between those two steps redelivers the batch: delivery is at least once, and
+consumers must tolerate duplicates. Ids are never reused (AUTOINCREMENT), so
+`id` identifies an event across redeliveries.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import settings
+from core.models import OutboxEvent, db_helper
+from core.retry import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxSink(Protocol):
+    async def send(self, events: list[dict[str, Any]]) -> None:
+        """
+        Deliver a batch; raising leaves the whole batch in the outbox.
+        """
+
+
+class InMemorySink:
+    """Keeps delivered events in a list, for tests and local runs."""
+
+    def __init__(self):
+        self.events: list[dict[str, Any]] = []
+
+    async def send(self, events: list[dict[str, Any]]) -> None:
+        self.events.extend(events)
+
+
+class FileSink:
+    """Appends delivered events to an NDJSON file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _write(self, lines: str) -> None:
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(lines)
+
+    async def send(self, events: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        # file I/O stays off the event loop
+        await asyncio.to_thread(self._write, lines)
+
+
+@retry_on_locked
+async def _acknowledge(session: AsyncSession, event_ids: list[int]) -> None:
+    await session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(event_ids)))
+    await session.commit()
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        sink: OutboxSink,
+        batch_size: int = 100,
+        poll_interval_ms: float = 1000.0,
+        max_backoff_ms: float = 30_000.0,
+    ):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval_ms / 1000
+        self.max_backoff = max_backoff_ms / 1000
+        self._wakeup: asyncio.Event | None = None
+        self._stopped: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        # seconds between an event being written and its batch being delivered
+        self.last_lag: float | None = None
+        self.max_lag: float | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._worker = asyncio.create_task(self._run(), name="outbox-dispatcher")
+
+    async def stop(self) -> None:
+        """
+        Finish the batch being delivered, then stop the worker.
+
+        Events still in the outbox are delivered after the next start.
+        """
+        if not self.running:
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        await self._worker
+        self._worker = None
+        self._wakeup = None
+        self._stopped = None
+
+    def notify(self) -> None:
+        """
+        Wake the worker after a commit that wrote events, instead of waiting
+        for the next poll.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                delivered = await self.dispatch_batch()
+            except Exception:
+                self.failures += 1
+                self.consecutive_failures += 1
+                logger.exception("Outbox delivery failed, the batch will be retried")
+                # new events do not cut the backoff short, only stop() does
+                await self._wait(
+                    self._stopped,
+                    min(
+                        self.poll_interval * 2**self.consecutive_failures,
+                        self.max_backoff,
+                    ),
+                )
+                continue
+            self.consecutive_failures = 0
+            if delivered < self.batch_size:
+                # drained; a full batch means more may be waiting right now
+                await self._wait(self._wakeup, self.poll_interval)
+
+    @staticmethod
+    async def _wait(event: asyncio.Event, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def dispatch_batch(self) -> int:
+        """
+        Deliver the oldest `batch_size` events and remove them from the outbox.
+        """
+        async with self.session_factory() as session:
+            stmt = (
+                select(
+                    OutboxEvent.id,
+                    OutboxEvent.topic,
+                    OutboxEvent.aggregate_id,
+                    OutboxEvent.payload,
+                    OutboxEvent.created_at,
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )
+            events = [row._asdict() for row in await session.execute(stmt)]
+            # release the read transaction before waiting on the sink
+            await session.rollback()
+            if not events:
+                return 0
+            await self.sink.send(events)
+            await _acknowledge(
+                session=session, event_ids=[event["id"] for event in events]
+            )
+        now = datetime.now()
+        self.last_lag = (now - events[-1]["created_at"]).total_seconds()
+        oldest_lag = (now - events[0]["created_at"]).total_seconds()
+        self.max_lag = max(self.max_lag or 0.0, oldest_lag)
+        self.delivered += len(events)
+        self.batches += 1
+        return len(events)
+
+    async def backlog(self) -> dict:
+        """
+        Events waiting in the outbox and the age of the oldest one.
+        """
+        async with self.session_factory() as session:
+            pending, oldest = (
+                await session.execute(
+                    select(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at))
+                )
+            ).one()
+        return {
+            "pending": pending,
+            "oldest_pending_age_seconds": (
+                round((datetime.now() - oldest).total_seconds(), 3)
+                if oldest is not None
+                else None
+            ),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+        }
+
+
+def _sink_from_settings() -> OutboxSink:
+    if settings.outbox.sink == "memory":
+        return InMemorySink()
+    return FileSink(settings.outbox.file_path)
+
+
+outbox_dispatcher = OutboxDispatcher(
+    session_factory=db_helper.session_factory,
+    sink=_sink_from_settings(),
+    batch_size=settings.outbox.batch_size,
+    poll_interval_ms=settings.outbox.poll_interval_ms,
+    max_backoff_ms=settings.outbox.max_backoff_ms,
+)
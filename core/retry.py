@@ -0,0 +1,107 @@
+"""
+Retry units of work that failed on SQLite lock contention.
+
+SQLite allows one writer at a time; when `busy_timeout` runs out the writer
+gets SQLITE_BUSY ("database is locked"). A unit of work that commits on its
+own (a crud write function) can safely be rolled back and run again, so the
+request pays with latency instead of failing.
+"""
+
+import asyncio
+import functools
+import logging
+import random
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_LOCK_MESSAGES = ("database is locked", "database is busy", "database table is locked")
+
+
+def is_lock_error(error: BaseException) -> bool:
+    return isinstance(error, OperationalError) and any(
+        message in str(error.orig).lower() for message in _LOCK_MESSAGES
+    )
+
+
+class LockRetry:
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay_ms: float = 10.0,
+        max_delay_ms: float = 500.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.lock_errors = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+
+    def delay(self, attempt: int) -> float:
+        # exponential backoff with full jitter, so colliding writers spread out
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def __call__(
+        self,
+        func: Callable[P, Awaitable[R]],
+    ) -> Callable[P, Awaitable[R]]:
+        """
+        Decorate an async unit of work taking a `session` argument.
+        """
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            session: AsyncSession = kwargs.get("session") or args[0]
+            attempt = 0
+            while True:
+                try:
+                    result = await func(*args, **kwargs)
+                except OperationalError as error:
+                    if not is_lock_error(error):
+                        raise
+                    self.lock_errors += 1
+                    await session.rollback()
+                    attempt += 1
+                    if attempt >= self.max_attempts:
+                        self.exhausted += 1
+                        raise
+                    self.retries += 1
+                    delay = self.delay(attempt)
+                    logger.info(
+                        "%s hit a locked database, retry %d in %.3fs",
+                        func.__qualname__,
+                        attempt,
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                if attempt:
+                    self.recovered += 1
+                return result
+
+        return wrapper
+
+    def stats(self) -> dict:
+        return {
+            "lock_errors": self.lock_errors,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+        }
+
+
+retry_on_locked = LockRetry(
+    max_attempts=settings.lock_retry.max_attempts,
+    base_delay_ms=settings.lock_retry.base_delay_ms,
+    max_delay_ms=settings.lock_retry.max_delay_ms,
+)
@@ -0,0 +1,128 @@
+"""
+Structured slow-query log, replacing the always-on engine echo.
+
+Statements slower than the threshold are always logged together with their
+EXPLAIN QUERY PLAN; faster ones are logged for a sampled fraction only.
+Parameters are redacted to their types by default. Records go through a
+QueueHandler, so the event loop only pays for a queue put and the formatting
+and I/O happen on the QueueListener thread.
+"""
+
+import json
+import logging
+import random
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+
+logger = logging.getLogger("microshop.slow_queries")
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = 100.0,
+        sample_rate: float = 0.0,
+        redact_params: bool = True,
+        explain: bool = True,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.redact_params = redact_params
+        self.explain = explain
+        self.listener: QueueListener | None = None
+
+    def install(self, *engines: AsyncEngine) -> None:
+        for engine in engines:
+            sync_engine = engine.sync_engine
+            if event.contains(sync_engine, "after_cursor_execute", self._after_execute):
+                continue
+            event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+            event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+
+    def start(self, *handlers: logging.Handler) -> None:
+        """
+        Route records through a queue to `handlers` (stderr by default).
+        """
+        if self.listener is not None:
+            return
+        queue: SimpleQueue = SimpleQueue()
+        logger.addHandler(QueueHandler(queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.listener = QueueListener(
+            queue,
+            *(handlers or (logging.StreamHandler(),)),
+            respect_handler_level=True,
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener is None:
+            return
+        # flushes every record queued so far before returning
+        self.listener.stop()
+        self.listener = None
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler):
+                logger.removeHandler(handler)
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        # on the execution context rather than the pooled connection: a
+        # statement that raises never reaches _after_execute
+        context._slow_query_started_at = perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = perf_counter() - context._slow_query_started_at
+        slow = duration >= self.threshold
+        if not slow and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return
+        record: dict[str, Any] = {
+            "event": "slow_query" if slow else "sampled_query",
+            "duration_ms": round(duration * 1000, 3),
+            "statement": " ".join(statement.split()),
+            "executemany": executemany,
+            "params": self._params(parameters, executemany),
+        }
+        if slow and self.explain and not executemany:
+            record["plan"] = self._query_plan(conn, statement, parameters)
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
+
+    def _params(self, parameters, executemany: bool) -> Any:
+        if executemany:
+            return {"count": len(parameters)}
+        if self.redact_params:
+            return [type(value).__name__ for value in parameters]
+        return [repr(value)[:100] for value in parameters]
+
+    @staticmethod
+    def _query_plan(conn, statement: str, parameters) -> list[str] | None:
+        if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            return None
+        # the raw DBAPI cursor bypasses the engine events, so this does not recurse
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as error:
+            return [f"unavailable: {error}"]
+        finally:
+            cursor.close()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_log.threshold_ms,
+    sample_rate=settings.slow_query_log.sample_rate,
+    redact_params=settings.slow_query_log.redact_params,
+    explain=settings.slow_query_log.explain,
+)
@@ -0,0 +1,163 @@
+"""
+Single-writer queue with group commit.
+
+SQLite serializes writers anyway, and each commit costs an fsync. Requests
+hand their write as a unit of work (an async function taking a session) to
+the coordinator. One worker task runs the queued units on one session, each
+inside its own SAVEPOINT so a failing unit does not affect the others. It
+commits once per group of up to `max_batch_size` units or `max_delay_ms`,
+whichever comes first. A caller's future resolves only after the group
+commit, so a returned result is durable.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import settings
+from core.models import db_helper
+from core.retry import is_lock_error, retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WorkUnit = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteCoordinator:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch_size: int = 64,
+        max_delay_ms: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self.groups = 0
+        self.units = 0
+        self.failed_units = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name="write-coordinator")
+
+    async def stop(self) -> None:
+        """
+        Commit everything queued so far, then stop the worker.
+        """
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+        self._queue = None
+
+    async def submit(self, work: WorkUnit[T]) -> T:
+        if not self.running:
+            raise RuntimeError("Write coordinator is not running!")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((work, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            group = [item]
+            deadline = loop.time() + self.max_delay
+            while len(group) < self.max_batch_size:
+                try:
+                    if self._queue.empty():
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+            try:
+                await self._commit_group(group)
+            except Exception as error:
+                logger.exception("Write group of %d units failed", len(group))
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(error)
+
+    async def _commit_group(self, group: list) -> None:
+        attempt = 0
+        while True:
+            # cancelled callers and units that already failed on their own drop out
+            pending = [(work, future) for work, future in group if not future.done()]
+            if not pending:
+                return
+            try:
+                results = await self._apply_group(pending)
+            except Exception as error:
+                # the whole group was rolled back; its units only touched the
+                # session, so a locked database is retried as a group
+                attempt += 1
+                if not is_lock_error(error) or attempt >= retry_on_locked.max_attempts:
+                    raise
+                await asyncio.sleep(retry_on_locked.delay(attempt))
+                continue
+            if results:
+                # a group whose units all failed committed nothing
+                self.groups += 1
+                self.units += len(results)
+            for future, result in results:
+                if not future.done():
+                    future.set_result(result)
+            return
+
+    async def _apply_group(self, group: list) -> list:
+        async with self.session_factory() as session:
+            results = []
+            for work, future in group:
+                try:
+                    async with session.begin_nested():
+                        result = await work(session)
+                except Exception as error:
+                    if is_lock_error(error):
+                        raise
+                    self.failed_units += 1
+                    future.set_exception(error)
+                    continue
+                results.append((future, result))
+            await session.commit()
+            return results
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "groups": self.groups,
+            "units": self.units,
+            "failed_units": self.failed_units,
+            "avg_group_size": round(self.units / self.groups, 2) if self.groups else 0,
+        }
+
+
+write_coordinator = WriteCoordinator(
+    session_factory=db_helper.session_factory,
+    max_batch_size=settings.write_coordinator.max_batch_size,
+    max_delay_ms=settings.write_coordinator.max_delay_ms,
+)
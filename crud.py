@@ -2,12 +2,14 @@ import asyncio
 
 from sqlalchemy import select
 from sqlalchemy.engine import Result
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.models import db_helper, User, Profile, Post
+from core.retry import retry_on_locked
+from api_v1.orders.crud import add_product_to_orders, stream_orders
+from api_v1.orders.schemas import OrdersPromotion
 from core.models.order import Order
-from core.models.order_product_association import OrderProductAssociation
 from core.models.product import Product
 
 
@@ -213,6 +215,7 @@ async def get_orders_with_products(session: AsyncSession) -> list[Order]:
     pass
 
 
+@retry_on_locked
 async def create_order(session: AsyncSession, promo_code: str | None = None) -> Order:
     order = Order(promo_code=promo_code)
     session.add(order)
@@ -220,6 +223,7 @@ async def create_order(session: AsyncSession, promo_code: str | None = None) ->
     return order
 
 
+@retry_on_locked
 async def create_products(
     session: AsyncSession, name: str, description: str, price: int
 ) -> Product:
@@ -237,21 +241,6 @@ joinedload()---
 """
 
 
-async def get_orders_with_products_association(session: AsyncSession):
-    stmt = (
-        select(Order)
-        .options(
-            selectinload(Order.product_details).joinedload(
-                OrderProductAssociation.product
-            ),
-        )
-        .order_by(Order.id)
-    )
-    orders = await session.scalars(stmt)
-
-    return list(orders)
-
-
 async def demo_get_orders_with_products_through_secondary(session: AsyncSession):
     # await create_orders_and_products(session)
     orders = await get_orders_with_products(session)
@@ -263,24 +252,18 @@ async def demo_get_orders_with_products_through_secondary(session: AsyncSession)
 
 
 async def demo_get_orders_with_products_with_association(session: AsyncSession):
-    orders = await get_orders_with_products_association(session)
-
-    for order in orders:
+    # orders are printed as they are read, the history is never held in memory
+    async for order in stream_orders(session=session, chunk_size=1000):
         print(
             f"Order {order.id}, Promo: {order.promo_code}, Created: {order.created_at}"
         )
-        print(f"Number of product details: {len(order.product_details)}")
-        for order_product_details in order.product_details:
-            print("Product details object:", order_product_details)
-            try:
-                print(
-                    f"Product ID: {order_product_details.product.id if order_product_details.product else 'No product'}, "
-                    f"Name: {order_product_details.product.name if order_product_details.product else 'No name'}, "
-                    f"Price: {order_product_details.product.price if order_product_details.product else 'No price'}, "
-                    f"Quantity: {order_product_details.quantity}"
-                )
-            except Exception as e:
-                print(f"Error accessing product details: {e}")
+        print(f"Number of product details: {len(order.items)}, Total: {order.total}")
+        for line in order.items:
+            print(
+                f"Product ID: {line.product_id}, "
+                f"Price: {line.unit_price}, "
+                f"Quantity: {line.quantity}"
+            )
         print()
 
 
@@ -294,20 +277,17 @@ async def demo_get_orders_with_products_with_association(session: AsyncSession):
 
 
 async def create_gift_product_for_existing_orders(session: AsyncSession):
-    orders = await get_orders_with_products_association(session)
     gift_product = await create_products(
         session,
         name="Gift Product",
         description="Gift for you!!",
         price=0,
     )
-
-    for order in orders:
-        order.product_details.append(
-            OrderProductAssociation(quantity=1, unit_price=0, product=gift_product)
-        )
-    await session.commit()
-    print("Gift product added to orders")
+    orders_affected = await add_product_to_orders(
+        session=session,
+        promotion=OrdersPromotion(product_id=gift_product.id),
+    )
+    print(f"Gift product added to {orders_affected} orders")
 
 
 async def demo_many_to_many_relationship(session: AsyncSession):
@@ -5,6 +5,11 @@ from fastapi import FastAPI
 import uvicorn
 
 from core.config import settings
+from core.instrumentation import QueryStatsMiddleware, query_instrumentation
+from core.models import db_helper
+from core.outbox import outbox_dispatcher
+from core.slow_query_log import slow_query_log
+from core.write_coordinator import write_coordinator
 from api_v1 import router as router_v1
 from items_views import router as items_router
 from users.views import router as users_router
@@ -12,11 +17,24 @@ from users.views import router as users_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-
+    if settings.slow_query_log.enabled:
+        slow_query_log.start()
+    if settings.write_coordinator.enabled:
+        await write_coordinator.start()
+    if settings.outbox.enabled:
+        await outbox_dispatcher.start()
     yield
+    await outbox_dispatcher.stop()
+    await write_coordinator.stop()
+    slow_query_log.stop()
 
 
 app = FastAPI(lifespan=lifespan)
+if settings.instrumentation.enabled:
+    query_instrumentation.install(*db_helper.engines)
+    app.add_middleware(QueryStatsMiddleware, instrumentation=query_instrumentation)
+if settings.slow_query_log.enabled:
+    slow_query_log.install(*db_helper.engines)
 app.include_router(router=router_v1, prefix=settings.api_v1_prefix)
 app.include_router(items_router)
 app.include_router(users_router)